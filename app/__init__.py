@@ -5,8 +5,11 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from flask import Flask
 
+from faceit_core.settings import settings
+
 app = Flask(__name__, template_folder='templates')
-app.config.from_object('config.Config')
+# те же значения, что видит ядро (config.Config и переопределения через settings.configure)
+app.config.update(settings.values)
 
 
 from app import routes
\ No newline at end of file
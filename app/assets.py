@@ -0,0 +1,90 @@
+import json
+import mimetypes
+import os
+import threading
+
+from flask import url_for, send_from_directory, request, abort
+
+DIST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'dist')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+
+class AssetManifest:
+    """ Соответствие исходных путей статики собранным файлам с хэшем (tools/build_assets.py).
+
+    Без собранного manifest.json все ссылки ведут на обычную статику из app/static.
+    """
+
+    def __init__(self, dist_dir):
+        self.dist_dir = dist_dir
+        self.data = None
+        self.sprite_flags = frozenset()
+        self.flag_urls_cache = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        if self.data is None:
+            with self.lock:
+                if self.data is None:
+                    try:
+                        with open(os.path.join(self.dist_dir, 'manifest.json')) as f:
+                            data = json.load(f)
+                    except (OSError, ValueError):
+                        data = {}
+                    self.sprite_flags = frozenset(data.get('sprite_flags') or ())
+                    self.data = data
+        return self.data
+
+    def url(self, path):
+        hashed = self.load().get('assets', {}).get(path)
+        if hashed is None:
+            return url_for('static', filename=path)
+        return url_for('asset', filename=hashed)
+
+    def flag_sprite_url(self):
+        sprite = self.load().get('flag_sprite')
+        return url_for('asset', filename=sprite) if sprite else None
+
+    def sprite_flag_codes(self):
+        self.load()
+        return sorted(self.sprite_flags)
+
+    def flag_urls(self):
+        """ {код: ссылка} для флагов вне спрайта — клиентский код берёт адреса отсюда, а не собирает их сам """
+        if self.flag_urls_cache is None:
+            assets = self.load().get('assets')
+            if assets:
+                names = [path[len('flags/'):] for path in assets if path.startswith('flags/')]
+            else:
+                flags_dir = os.path.join(os.path.dirname(self.dist_dir), 'flags')
+                names = os.listdir(flags_dir) if os.path.isdir(flags_dir) else []
+            codes = sorted(name[:-len('.svg')] for name in names if name.endswith('.svg') and name != 'sprite.svg')
+            self.flag_urls_cache = {code: self.url(f'flags/{code}.svg') for code in codes if code not in self.sprite_flags}
+        return self.flag_urls_cache
+
+    def flag_href(self, code):
+        """ Ссылка на <symbol> флага в спрайте или None, если флаг отдаётся отдельным файлом """
+        code = (code or '').lower()
+        self.load()
+        if code not in self.sprite_flags:
+            return None
+        return f'{self.flag_sprite_url()}#flag-{code}'
+
+
+def send_asset(dist_dir, filename):
+    """ Собранный файл с вечным кэшированием; заранее сжатый вариант, если клиент его принимает """
+    path = os.path.join(dist_dir, filename)
+    if not os.path.isfile(path):
+        abort(404)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    for encoding, suffix in PRECOMPRESSED:
+        if encoding in request.accept_encodings and os.path.isfile(path + suffix):
+            response = send_from_directory(dist_dir, filename + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(dist_dir, filename, mimetype=mimetype)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = IMMUTABLE
+    return response
@@ -0,0 +1,53 @@
+import hashlib
+import json
+import threading
+
+from markupsafe import Markup
+
+from faceit_core.cache import CountingTTLCache
+
+
+def fingerprint(*parts):
+    """ Стабильный отпечаток данных, из которых строится страница или фрагмент """
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class RenderCache:
+    """ Кэш отрендеренного HTML по отпечатку данных (TTL + ограничение размера).
+
+    С общим бэкендом (shared) отрендеренное одним процессом переиспользуют остальные.
+    """
+
+    def __init__(self, maxsize, ttl, shared=None, namespace='render'):
+        self.ttl = ttl
+        self.shared = shared
+        self.namespace = namespace
+        self.entries = CountingTTLCache(maxsize=maxsize, ttl=ttl)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, render):
+        with self.lock:
+            html = self.entries.get(key)
+            if html is not None:
+                self.hits += 1
+                return html
+            self.misses += 1
+        html = self.shared.get(self.namespace, key) if self.shared is not None else None
+        if html is None:
+            html = render()
+            if self.shared is not None:
+                self.shared.set(self.namespace, key, html, self.ttl)
+        with self.lock:
+            self.entries[key] = html
+        return html
+
+    def fragment(self, name, key, render):
+        """ Отрендеренный фрагмент, безопасный для вставки в шаблон """
+        return Markup(self.get_or_render((name, key), render))
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.entries.evictions, 'size': len(self.entries)}
@@ -1,9 +1,126 @@
-from flask import render_template, request, redirect, url_for, jsonify
-from requests.exceptions import HTTPError
+import gzip
+import json
+import time
+from concurrent.futures import as_completed
+from flask import render_template, request, redirect, url_for, jsonify, abort, make_response, Response, stream_with_context, g
+from markupsafe import Markup
+from requests.exceptions import HTTPError, RequestException
 from app import app
-from app.models import Player, get_player_stats, search_by_steamid_64, format_date, calculate_averages, calculate_cs2_statistics, format_time_since
+from faceit_core import deadline
+from faceit_core import metrics
+from faceit_core.players import Player, leaderboard, shared_cache, fetch_player_profile, fetch_profile_sections, search_by_steamid_64, is_valid_lookup
+from faceit_core.leaderboard import API_FIELDS, project_row, encode_cursor, decode_cursor
+from faceit_core.match_store import match_id
+from faceit_core.lobby import LobbyError, fetch_lobby, parse_match_id
+from app.page_cache import RenderCache, fingerprint
+from app.assets import AssetManifest, DIST_DIR, send_asset
+from app.view_models import PAGE_HISTORY_DEPTH, build_profile_header, build_ranks, build_lifetime, build_history, build_map_segments
+
+page_cache = RenderCache(maxsize=app.config['PAGE_CACHE_SIZE'], ttl=app.config['PAGE_CACHE_TTL'], shared=shared_cache)
+metrics.register_cache('page', page_cache.stats)
+assets = AssetManifest(DIST_DIR)
+app.add_template_global(assets.url, 'asset_url')
+app.add_template_global(assets.flag_href, 'flag_href')
+app.add_template_global(assets.flag_sprite_url, 'flag_sprite_url')
+app.add_template_global(assets.sprite_flag_codes, 'sprite_flag_codes')
+app.add_template_global(assets.flag_urls, 'flag_urls')
+
+
+@app.before_request
+def start_request_deadline():
+    """ Один бюджет времени на запрос: все обращения к API получают его остаток как таймаут """
+    g.deadline_token = deadline.start(app.config['REQUEST_BUDGET'])
+    g.request_started_at = time.perf_counter()
+
+
+@app.after_request
+def observe_request(response):
+    """ Время до отдачи заголовков (у потоковой страницы — до первого блока) по шаблону маршрута """
+    started_at = g.pop('request_started_at', None)
+    if started_at is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.http_seconds.observe(time.perf_counter() - started_at, route, request.method)
+        metrics.http_requests.inc(route, request.method, str(response.status_code))
+    return response
+
+
+@app.teardown_request
+def clear_request_deadline(exc=None):
+    token = g.pop('deadline_token', None)
+    if token is not None:
+        deadline.reset(token)
+
+
+def cached_page(data_fingerprint, render):
+    """ Ответ из кэша страниц со строгим ETag; при совпадении If-None-Match — 304 без рендера """
+    etag = fingerprint(request.path, data_fingerprint)
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(page_cache.get_or_render(etag, render))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+SECTION_TEMPLATES = {
+    'ranks': 'partials/player_ranks.html',
+    'recent_results': 'partials/recent_results.html',
+    'main_statistics': 'partials/main_statistics.html',
+    'average_windows': 'partials/average_windows.html',
+    'match_history': 'partials/match_history.html',
+    'map_segments': 'partials/map_segments.html',
+}
+STREAM_MARKER = '<!-- streamed-sections -->'
+NO_DATA = Markup('<p>No data</p>')
+
+
+def render_section(name, cache_key=None, **context):
+    """ Один блок страницы игрока; тяжёлые блоки кэшируются как фрагменты по cache_key """
+    render = lambda: render_template(SECTION_TEMPLATES[name], **context)
+    if cache_key is None:
+        return Markup(render())
+    return page_cache.fragment(name, cache_key, render)
+
+
+def requested_history_depth():
+    """ Глубина истории для страницы: ровно сколько нужно окнам средних, глубже — по ?matches=N """
+    depth = request.args.get('matches', PAGE_HISTORY_DEPTH, type=int)
+    return max(PAGE_HISTORY_DEPTH, min(depth, app.config['MATCH_HISTORY_MAX_DEPTH']))
+
+
+def section_placeholder(name):
+    return Markup('<div id="slot-{}" class="section-loading"></div>').format(name)
+
+
+def cached_json(payload, max_age):
+    """ Компактный JSON со строгим ETag на каждый вариант кодирования; gzip, если клиент его принимает """
+    body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode()
+    encoding = 'gzip' if 'gzip' in request.accept_encodings else 'identity'
+    etag = fingerprint(body.decode(), encoding)
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        if encoding == 'gzip':
+            body = page_cache.get_or_render(('gzip', etag), lambda: gzip.compress(body, 6))
+        response = make_response(body)
+        response.mimetype = 'application/json'
+        if encoding == 'gzip':
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    return response
+
+
+def render_ranking_rows(rankings):
+    return page_cache.fragment('ranking_rows', fingerprint(rankings),
+                               lambda: render_template('partials/ranking_rows.html', rankings=rankings))
+
 
 class PlayerView:
+    """ Состояние главной страницы; создаётся на каждый запрос """
+
     def __init__(self):
         self.error_message = None
         self.global_rankings = {
@@ -20,11 +137,18 @@ class PlayerView:
         except Exception as e:
             self.error_message = f"Ошибка при загрузке топ игроков: {str(e)}"
 
-    def render_index(self):
-        return render_template('index.html', error_message=self.error_message,
-                               global_eu_ranking=self.global_rankings['EU'],
-                               global_na_ranking=self.global_rankings['NA'],
-                               global_sa_ranking=self.global_rankings['SA'])
+    def render_index(self, error_message=None):
+        error_message = error_message or self.error_message
+        rankings = self.global_rankings
+
+        def render():
+            return render_template('index.html', error_message=error_message,
+                                   eu_ranking_html=render_ranking_rows(rankings['EU']),
+                                   na_ranking_html=render_ranking_rows(rankings['NA']),
+                                   sa_ranking_html=render_ranking_rows(rankings['SA']),
+                                   next_cursors={region: encode_cursor(len(rows)) for region, rows in rankings.items()})
+
+        return cached_page(fingerprint(error_message, rankings), render)
 
     def handle_search(self, search_value):
         try:
@@ -45,10 +169,21 @@ class PlayerView:
         }
         return rankings_methods.get(region, lambda x, y: [])(limit, offset)
 
-player_view = PlayerView()
+@app.route('/metrics')
+def metrics_export():
+    if not app.config['METRICS_ENABLED']:
+        abort(404)
+    response = Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    return send_asset(DIST_DIR, filename)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
+    player_view = PlayerView()
     if request.method == 'POST':
         search_value = request.form.get('search_value')
         response = player_view.handle_search(search_value)
@@ -61,73 +196,213 @@ def index():
 @app.route('/load_more_rankings')
 def load_more_rankings():
     region = request.args.get('region', 'EU')
-    limit = 100
+    limit = max(1, min(request.args.get('limit', 100, type=int), app.config['LEADERBOARD_API_MAX_LIMIT']))
     offset = int(request.args.get('offset', 0))
-    rankings = player_view.get_rankings(region, limit, offset)
-    return jsonify(rankings)
+    rankings = PlayerView().get_rankings(region, limit, offset)
+    response = jsonify(rankings)
+    snapshot_age = leaderboard.age() if leaderboard is not None else None
+    if snapshot_age is not None:
+        response.headers['X-Leaderboard-Age'] = str(int(snapshot_age))
+    return response
+
+@app.route('/api/leaderboard/<region>')
+def leaderboard_api(region):
+    """ Страница рейтинга региона для бесконечной прокрутки: курсор, только нужные поля, строки массивами """
+    region = region.upper()
+    if region not in app.config['LEADERBOARD_REGIONS']:
+        abort(404)
+    try:
+        offset = decode_cursor(request.args['cursor']) if 'cursor' in request.args else 0
+    except ValueError:
+        return jsonify({'error': 'invalid cursor'}), 400
+    limit = max(1, min(request.args.get('limit', 50, type=int), app.config['LEADERBOARD_API_MAX_LIMIT']))
+    depth = app.config['LEADERBOARD_DEPTH']
+
+    limit = min(limit, depth - offset)
+    rows = Player.get_global_ranking(region, limit, offset) if limit > 0 else []
+    next_offset = offset + len(rows)
+    payload = {
+        'fields': API_FIELDS,
+        'rows': [project_row(row) for row in rows],
+        'next': encode_cursor(next_offset) if rows and len(rows) == limit and next_offset < depth else None,
+    }
+    return cached_json(payload, app.config['LEADERBOARD_API_MAX_AGE'])
+
+@app.route('/api/lobby')
+def lobby_api():
+    """ Сравнение команд лобби: ?match=<id или ссылка на комнату> или ?players=ник1,ник2,...,vs,... """
+    if 'match' in request.args and parse_match_id(request.args['match']) is None:
+        return jsonify({'error': 'invalid match id'}), 400
+    try:
+        lobby = fetch_lobby(request.args.get('match') or request.args.get('players', ''))
+    except LobbyError as e:
+        return jsonify({'error': str(e)}), 400
+    except HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return jsonify({'error': 'match not found'}), 404
+        app.logger.error(f"Failed to load lobby: {e}")
+        return jsonify({'error': 'FACEIT API error'}), 502
+    except RequestException as e:
+        app.logger.error(f"Failed to load lobby: {e}")
+        return jsonify({'error': 'FACEIT API unavailable'}), 502
+    return jsonify(lobby)
 
 class PlayerStatsView:
+    """ Состояние страницы игрока; создаётся на каждый запрос """
+
     def __init__(self):
         self.error_message = None
+        self.not_found = False
+
+    def player_not_found(self, nickname):
+        """ Промах поиска — и первый, и из кэша промахов — показывается одинаково и отдаётся с 404 """
+        self.not_found = True
+        self.error_message = f"Ошибка при поиске игрока '{nickname}': игрок не найден."
+
+    def player_error(self, nickname, error):
+        """ Сбой API (5xx, таймаут, исчерпанный бюджет запроса): общее сообщение, подробности только в лог """
+        app.logger.warning("Failed to load player %s: %s", nickname, error)
+        self.error_message = f"Ошибка при получении информации об игроке '{nickname}': сервис временно недоступен."
     
-    def get_player_data(self, nickname):
+    def get_player_data(self, nickname, limit):
         try:
-            player_info_data, player_id, nickname, player_global_rank, player_country_rank = search_by_steamid_64(nickname)
-            if player_id:
-                player_stats_data, full_player_stats_data = get_player_stats(player_id, limit=200)
-                if player_stats_data and full_player_stats_data:
-                    return player_info_data, player_stats_data, full_player_stats_data, player_global_rank, player_country_rank
+            player_info_data, player_stats_data, full_player_stats_data, player_global_rank, player_country_rank = fetch_player_profile(nickname, limit)
+            if player_info_data and player_stats_data:
+                return player_info_data, player_stats_data, full_player_stats_data, player_global_rank, player_country_rank
+            self.player_not_found(nickname)
         except HTTPError as e:
             if e.response.status_code == 404:
-                self.error_message = f"Ошибка при поиске игрока '{nickname}': игрок не найден."
+                self.player_not_found(nickname)
             else:
-                self.error_message = f"Ошибка при получении информации об игроке '{nickname}': {str(e)}"
+                self.player_error(nickname, e)
         except Exception as e:
-            self.error_message = f"Ошибка при получении информации об игроке '{nickname}': {str(e)}"
+            self.player_error(nickname, e)
         return None, None, None, None, None
 
+    def get_player_info(self, nickname, limit):
+        """ Профиль игрока (его достаточно для первой отрисовки страницы) и futures остальных разделов """
+        try:
+            player_info_data, futures = fetch_profile_sections(nickname, limit)
+            if player_info_data:
+                return player_info_data, futures
+            self.player_not_found(nickname)
+        except HTTPError as e:
+            if e.response.status_code == 404:
+                self.player_not_found(nickname)
+            else:
+                self.player_error(nickname, e)
+        except Exception as e:
+            self.player_error(nickname, e)
+        return None, None
+
+    def render_history_sections(self, player_stats_data):
+        match_ids = [match_id(item) for item in player_stats_data['items']]
+        minute = int(time.time() // 60)
+        history = build_history(player_stats_data)
+        return {
+            'average_windows': render_section('average_windows', fingerprint(match_ids),
+                                              average_windows=history['average_windows']),
+            'match_history': render_section('match_history', fingerprint(match_ids, minute), matches=history['matches']),
+        }
+
+    def render_lifetime_sections(self, full_player_stats_data):
+        if not full_player_stats_data:
+            return {name: NO_DATA for name in ('recent_results', 'main_statistics', 'map_segments')}
+        lifetime = build_lifetime(full_player_stats_data)
+        map_segments = build_map_segments(full_player_stats_data['segments'])
+        return {
+            'recent_results': render_section('recent_results', recent_results=lifetime['recent_results']),
+            'main_statistics': render_section('main_statistics', main_statistics=lifetime['main_statistics'],
+                                              lifetime=lifetime['lifetime']),
+            'map_segments': render_section('map_segments', fingerprint(map_segments), map_segments=map_segments),
+        }
+
     def render_player_stats(self, nickname, player_info_data, player_stats_data, full_player_stats_data, player_global_rank, player_country_rank):
-        formatted_activated_at = format_date(player_info_data['activated_at'])
-        player_global_rank_formatted = "{:,}".format(player_global_rank) if player_global_rank is not None else None
-        player_country_rank_formatted = "{:,}".format(player_country_rank) if player_country_rank is not None else None
-        skill_level = str(player_info_data['games']['cs2']['skill_level']) if 'games' in player_info_data and 'cs2' in player_info_data['games'] and 'skill_level' in player_info_data['games']['cs2'] else None
-        recent_results = full_player_stats_data['lifetime']['Recent Results']
-        averages_last_20 = calculate_averages(player_stats_data, 20)
-        averages_prev_20 = calculate_averages(player_stats_data, 20, start_index=20)
-        averages_last_50 = calculate_averages(player_stats_data, 50)
-        averages_prev_50 = calculate_averages(player_stats_data, 50, start_index=50)
-        averages_last_100 = calculate_averages(player_stats_data, 100)
-        averages_prev_100 = calculate_averages(player_stats_data, 100, start_index=100)
-        main_statistics = calculate_cs2_statistics(full_player_stats_data)
-        relevant_maps = ['Mirage', 'Anubis', 'Dust2', 'Vertigo', 'Ancient', 'Nuke', 'Overpass', 'Inferno']
-        filtered_segments = [segment for segment in full_player_stats_data['segments'] if segment['mode'] == '5v5' and segment['label'] in relevant_maps]
-        filtered_segments.sort(key=lambda x: relevant_maps.index(x['label']))
-
-        return render_template('player_stats.html', nickname=nickname, player_stats_data=player_stats_data,
-                               player_info_data=player_info_data, full_player_stats_data=full_player_stats_data,
-                               player_global_rank=player_global_rank_formatted,
-                               player_country_rank=player_country_rank_formatted, formatted_activated_at=formatted_activated_at,
-                               recent_results=recent_results, skill_level=skill_level,
-                               averages_last_20=averages_last_20,
-                               averages_prev_20=averages_prev_20,
-                               averages_last_50=averages_last_50,
-                               averages_prev_50=averages_prev_50,
-                               averages_last_100=averages_last_100,
-                               averages_prev_100=averages_prev_100,
-                               main_statistics=main_statistics,
-                               format_time_since=format_time_since,
-                               filtered_segments=filtered_segments)
-
-player_stats_view = PlayerStatsView()
+        match_ids = [match_id(item) for item in player_stats_data['items']]
+        minute = int(time.time() // 60)
+
+        def render():
+            header = build_profile_header(player_info_data)
+            sections = {'ranks': render_section('ranks', header=header, ranks=build_ranks(player_global_rank, player_country_rank))}
+            sections.update(self.render_lifetime_sections(full_player_stats_data))
+            sections.update(self.render_history_sections(player_stats_data))
+            return render_template('player_stats.html', nickname=nickname, header=header,
+                                   **{name + '_html': html for name, html in sections.items()})
+
+        data_fingerprint = fingerprint(player_info_data, full_player_stats_data, player_global_rank, player_country_rank,
+                                       match_ids, minute)
+        return cached_page(data_fingerprint, render)
+
+    def iter_sections(self, header, futures):
+        """ Отрендеренные блоки страницы в порядке готовности данных; не успевшие к дедлайну — без данных """
+        pending = {future: key for key, future in futures.items()}
+        results = {}
+        try:
+            for future in as_completed(pending, timeout=deadline.wait_timeout()):
+                key = pending[future]
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    app.logger.warning("Player page section %s failed: %s", key, e)
+                    results[key] = None
+                yield from self.render_ready_sections(header, key, results)
+        except TimeoutError:
+            missed = [key for key in futures if key not in results]
+            app.logger.warning("Player page sections missed the request deadline: %s", ', '.join(missed))
+            for key in missed:
+                results[key] = None
+                yield from self.render_ready_sections(header, key, results)
+
+    def render_ready_sections(self, header, key, results):
+        """ Блоки, которые можно отрисовать после получения результата key """
+        if key in ('global_rank', 'country_rank'):
+            if 'global_rank' in results and 'country_rank' in results:
+                yield 'ranks', render_section('ranks', header=header,
+                                              ranks=build_ranks(results['global_rank'], results['country_rank']))
+        elif key == 'lifetime':
+            yield from self.render_lifetime_sections(results[key]).items()
+        elif key == 'history':
+            if results[key]:
+                yield from self.render_history_sections(results[key]).items()
+            else:
+                yield from ((name, NO_DATA) for name in ('average_windows', 'match_history'))
+
+    def stream_player_stats(self, nickname, player_info_data, futures):
+        """ Шапка уходит клиенту сразу после запроса профиля, остальные блоки дописываются по мере загрузки """
+        header = build_profile_header(player_info_data)
+        page = render_template('player_stats.html', nickname=nickname, header=header,
+                               **{name + '_html': section_placeholder(name) for name in SECTION_TEMPLATES})
+        head, tail = page.split(STREAM_MARKER, 1)
+
+        def generate():
+            yield head
+            for name, html in self.iter_sections(header, futures):
+                yield render_template('partials/section_fill.html', name=name, html=html)
+            yield tail
+
+        response = Response(stream_with_context(generate()), mimetype='text/html')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
 
 @app.route('/<nickname>')
 def player_stats(nickname):
-    player_info_data, player_stats_data, full_player_stats_data, player_global_rank, player_country_rank = player_stats_view.get_player_data(nickname)
-    if player_info_data:
-        return player_stats_view.render_player_stats(nickname, player_info_data, player_stats_data, full_player_stats_data, player_global_rank, player_country_rank)
+    if not is_valid_lookup(nickname):
+        abort(404)
+
+    player_stats_view = PlayerStatsView()
+    if app.config['PLAYER_PAGE_STREAMING']:
+        player_info_data, futures = player_stats_view.get_player_info(nickname, requested_history_depth())
+        if player_info_data:
+            return player_stats_view.stream_player_stats(nickname, player_info_data, futures)
+    else:
+        player_info_data, player_stats_data, full_player_stats_data, player_global_rank, player_country_rank = player_stats_view.get_player_data(nickname, requested_history_depth())
+        if player_info_data:
+            return player_stats_view.render_player_stats(nickname, player_info_data, player_stats_data, full_player_stats_data, player_global_rank, player_country_rank)
     
+    player_view = PlayerView()
     player_view.load_rankings()
-    return render_template('index.html', error_message=player_stats_view.error_message,
-                           global_eu_ranking=player_view.global_rankings['EU'],
-                           global_na_ranking=player_view.global_rankings['NA'],
-                           global_sa_ranking=player_view.global_rankings['SA'])
+    response = player_view.render_index(error_message=player_stats_view.error_message)
+    if player_stats_view.not_found and response.status_code == 200:
+        response.status_code = 404
+    return response
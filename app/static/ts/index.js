@@ -38,52 +38,61 @@ var _this = this;
 document.addEventListener('DOMContentLoaded', function () {
     var regions = ['EU', 'NA', 'SA'];
     var limit = 100;
-    var maxPlayers = 900;
-    var offset = { 'EU': 100, 'NA': 100, 'SA': 100 };
+    var flagSprite = document.body.dataset.flagSprite || '';
+    var spriteFlags = new Set((document.body.dataset.spriteFlags || '').split(' '));
+    var flagUrls = JSON.parse(document.body.dataset.flagUrls || '{}');
+    var tierIcon = document.body.dataset.tierIcon || '';
+    var flagHTML = function (country) {
+        var code = country.toLowerCase();
+        if (flagSprite && spriteFlags.has(code)) {
+            return "<svg class=\"top20elo-flag\" width=\"20\" height=\"15\" role=\"img\" aria-label=\"".concat(country, "\"><use href=\"").concat(flagSprite, "#flag-").concat(code, "\"></use></svg>");
+        }
+        return flagUrls[code] ? "<img class=\"top20elo-flag\" src=\"".concat(flagUrls[code], "\" alt=\"").concat(country, "\" width=\"20\" height=\"15\">") : '';
+    };
     regions.forEach(function (region) {
         var rankingContainer = document.getElementById("".concat(region.toLowerCase(), "-ranking-container"));
         var loading = document.getElementById("".concat(region.toLowerCase(), "-loading"));
-        var totalPlayersLoaded = 0;
         if (!rankingContainer || !loading) {
             console.error("Could not find elements for region ".concat(region));
             return;
         }
+        var nextCursor = rankingContainer.dataset.nextCursor || null;
+        var isLoading = false;
         var loadMoreRankings = function () { return __awaiter(_this, void 0, void 0, function () {
             var response, data, error_1;
             return __generator(this, function (_a) {
                 switch (_a.label) {
                     case 0:
-                        if (totalPlayersLoaded >= maxPlayers)
+                        if (!nextCursor || isLoading)
                             return [2];
+                        isLoading = true;
                         loading.style.display = 'block';
                         _a.label = 1;
                     case 1:
                         _a.trys.push([1, 4, 5, 6]);
-                        return [4 , fetch("/load_more_rankings?region=".concat(region, "&offset=").concat(offset[region], "&limit=").concat(limit))];
+                        return [4 , fetch("/api/leaderboard/".concat(region, "?cursor=").concat(encodeURIComponent(nextCursor), "&limit=").concat(limit))];
                     case 2:
                         response = _a.sent();
                         return [4 , response.json()];
                     case 3:
                         data = _a.sent();
-                        if (data.length > 0) {
-                            data.forEach(function (player) {
-                                if (totalPlayersLoaded >= maxPlayers)
-                                    return;
-                                var playerDiv = document.createElement('div');
-                                playerDiv.classList.add('top20elo-item');
-                                var rankHTML = player.rank === "9-1000" ? "\n                            <div class=\"top20elo-rank-9-1000\">\n                                <pre>#</pre>".concat(player.position, "\n                                <img title=\"Faceit Challenger 9-1000\" class=\"fc-9-1000\" src=\"../static/images/No.4-1000.svg\" alt=\"wood\" width=\"20\" height=\"20\">\n                            </div>") : '';
-                                playerDiv.innerHTML = "\n                            <div class=\"top20elo-ranks\">".concat(rankHTML, "</div>\n                            <div class=\"top20elo-nickname\">\n                                <img class=\"top20elo-flag\" src=\"/static/flags/").concat(player.country.toLowerCase(), ".svg\" alt=\"").concat(player.country, "\" width=\"20\" height=\"15\">\n                                <a href=\"/").concat(player.nickname, "\">").concat(player.nickname, "</a>\n                            </div>\n                            <div class=\"top20elo-elo\">").concat(player.faceit_elo, "</div>\n                        ");
-                                rankingContainer.appendChild(playerDiv);
-                                totalPlayersLoaded++;
-                            });
-                            offset[region] += limit;
-                        }
+                        data.rows.forEach(function (row) {
+                            var player = {};
+                            data.fields.forEach(function (field, index) { return player[field] = row[index]; });
+                            var playerDiv = document.createElement('div');
+                            playerDiv.classList.add('top20elo-item');
+                            var rankHTML = player.tier === "9-1000" ? "\n                        <div class=\"top20elo-rank-9-1000\">\n                            <pre>#</pre>".concat(player.position, "\n                            <img title=\"Faceit Challenger 9-1000\" class=\"fc-9-1000\" src=\"").concat(tierIcon, "\" alt=\"wood\" width=\"20\" height=\"20\">\n                        </div>") : '';
+                            playerDiv.innerHTML = "\n                        <div class=\"top20elo-ranks\">".concat(rankHTML, "</div>\n                        <div class=\"top20elo-nickname\">\n                            ").concat(flagHTML(player.country), "\n                            <a href=\"/").concat(player.nickname, "\">").concat(player.nickname, "</a>\n                        </div>\n                        <div class=\"top20elo-elo\">").concat(player.elo, "</div>\n                    ");
+                            rankingContainer.appendChild(playerDiv);
+                        });
+                        nextCursor = data.next;
                         return [3 , 6];
                     case 4:
                         error_1 = _a.sent();
                         console.error('Error loading more rankings:', error_1);
                         return [3 , 6];
                     case 5:
+                        isLoading = false;
                         if (loading) {
                             loading.style.display = 'none';
                         }
@@ -2,59 +2,74 @@ document.addEventListener('DOMContentLoaded', () => {
     // Code from index.ts
     const regions: string[] = ['EU', 'NA', 'SA'];
     const limit: number = 100;
-    const maxPlayers: number = 900;
-    let offset: { [key: string]: number } = { 'EU': 100, 'NA': 100, 'SA': 100 };
+    // Small flags come from one SVG symbol sheet built by tools/build_assets.py, the rest are separate files;
+    // every URL (hashed when the manifest exists) is rendered by the server into data- attributes
+    const flagSprite: string = document.body.dataset.flagSprite || '';
+    const spriteFlags: Set<string> = new Set((document.body.dataset.spriteFlags || '').split(' '));
+    const flagUrls: Record<string, string> = JSON.parse(document.body.dataset.flagUrls || '{}');
+    const tierIcon: string = document.body.dataset.tierIcon || '';
+
+    const flagHTML = (country: string): string => {
+        const code = country.toLowerCase();
+        if (flagSprite && spriteFlags.has(code)) {
+            return `<svg class="top20elo-flag" width="20" height="15" role="img" aria-label="${country}"><use href="${flagSprite}#flag-${code}"></use></svg>`;
+        }
+        return flagUrls[code] ? `<img class="top20elo-flag" src="${flagUrls[code]}" alt="${country}" width="20" height="15">` : '';
+    };
 
     regions.forEach(region => {
         const rankingContainer = document.getElementById(`${region.toLowerCase()}-ranking-container`) as HTMLElement | null;
         const loading = document.getElementById(`${region.toLowerCase()}-loading`) as HTMLElement | null;
-        let totalPlayersLoaded = 0;
 
         if (!rankingContainer || !loading) {
             console.error(`Could not find elements for region ${region}`);
             return; // Exit current iteration if elements are not found
         }
 
+        // The server hands out an opaque cursor for the next page and null once the leaderboard ends
+        let nextCursor: string | null = rankingContainer.dataset.nextCursor || null;
+        let isLoading: boolean = false;
+
         const loadMoreRankings = async () => {
-            if (totalPlayersLoaded >= maxPlayers) return;
+            if (!nextCursor || isLoading) return;
 
+            isLoading = true;
             loading.style.display = 'block';
 
             try {
-                const response = await fetch(`/load_more_rankings?region=${region}&offset=${offset[region]}&limit=${limit}`);
+                const response = await fetch(`/api/leaderboard/${region}?cursor=${encodeURIComponent(nextCursor)}&limit=${limit}`);
                 const data = await response.json();
 
-                if (data.length > 0) {
-                    data.forEach((player: any) => {
-                        if (totalPlayersLoaded >= maxPlayers) return;
-
-                        const playerDiv = document.createElement('div');
-                        playerDiv.classList.add('top20elo-item');
-
-                        const rankHTML = player.rank === "9-1000" ? `
-                            <div class="top20elo-rank-9-1000">
-                                <pre>#</pre>${player.position}
-                                <img title="Faceit Challenger 9-1000" class="fc-9-1000" src="../static/images/No.4-1000.svg" alt="wood" width="20" height="20">
-                            </div>` : '';
-
-                        playerDiv.innerHTML = `
-                            <div class="top20elo-ranks">${rankHTML}</div>
-                            <div class="top20elo-nickname">
-                                <img class="top20elo-flag" src="/static/flags/${player.country.toLowerCase()}.svg" alt="${player.country}" width="20" height="15">
-                                <a href="/${player.nickname}">${player.nickname}</a>
-                            </div>
-                            <div class="top20elo-elo">${player.faceit_elo}</div>
-                        `;
-
-                        rankingContainer.appendChild(playerDiv);
-                        totalPlayersLoaded++;
-                    });
-
-                    offset[region] += limit;
-                }
+                data.rows.forEach((row: any[]) => {
+                    const player: any = {};
+                    data.fields.forEach((field: string, index: number) => player[field] = row[index]);
+
+                    const playerDiv = document.createElement('div');
+                    playerDiv.classList.add('top20elo-item');
+
+                    const rankHTML = player.tier === "9-1000" ? `
+                        <div class="top20elo-rank-9-1000">
+                            <pre>#</pre>${player.position}
+                            <img title="Faceit Challenger 9-1000" class="fc-9-1000" src="${tierIcon}" alt="wood" width="20" height="20">
+                        </div>` : '';
+
+                    playerDiv.innerHTML = `
+                        <div class="top20elo-ranks">${rankHTML}</div>
+                        <div class="top20elo-nickname">
+                            ${flagHTML(player.country)}
+                            <a href="/${player.nickname}">${player.nickname}</a>
+                        </div>
+                        <div class="top20elo-elo">${player.elo}</div>
+                    `;
+
+                    rankingContainer.appendChild(playerDiv);
+                });
+
+                nextCursor = data.next;
             } catch (error) {
                 console.error('Error loading more rankings:', error);
             } finally {
+                isLoading = false;
                 if (loading) {
                     loading.style.display = 'none';
                 }
@@ -0,0 +1,160 @@
+from datetime import datetime
+
+from faceit_core.stats import format_date, format_time_since, calculate_cs2_statistics
+from faceit_core.stats_engine import MatchStats, parse_number
+
+RELEVANT_MAPS = ('Mirage', 'Anubis', 'Dust2', 'Vertigo', 'Ancient', 'Nuke', 'Overpass', 'Inferno')
+MAP_ORDER = {name: index for index, name in enumerate(RELEVANT_MAPS)}
+AVERAGE_WINDOWS = (20, 50, 100)
+# последние и предыдущие матчи для самого широкого окна средних
+PAGE_HISTORY_DEPTH = 2 * max(AVERAGE_WINDOWS)
+
+TOP_RANKS = {
+    1: ('top-rank-1', 'Faceit Challenger 1', 'fc-1', 'images/No.1.svg'),
+    2: ('top-rank-2', 'Faceit Challenger 2', 'fc-2', 'images/No.2.svg'),
+    3: ('top-rank-3', 'Faceit Challenger 3', 'fc-3', 'images/No.3.svg'),
+}
+
+
+def rank_position(rank):
+    """ Начало позиции рейтинга: 123, '1,234' или '4 - 9' -> int """
+    if rank is None:
+        return None
+    if isinstance(rank, int):
+        return rank
+    try:
+        return int(str(rank).split(' - ')[0].replace(',', ''))
+    except ValueError:
+        return None
+
+
+def format_rank(rank):
+    if rank is None:
+        return None
+    return "{:,}".format(rank) if isinstance(rank, int) else str(rank)
+
+
+def rank_tier(rank):
+    """ Оформление глобального места: класс блока, подпись и значок FACEIT Challenger """
+    position = rank_position(rank)
+    if position in TOP_RANKS:
+        css_class, title, icon_class, icon = TOP_RANKS[position]
+    elif position is not None and 4 <= position <= 9:
+        css_class, title, icon_class, icon = 'top-rank-4-9', 'Faceit Challenger 4-9', 'fc-4-9', 'images/No.4-1000.svg'
+    elif position is not None and 9 < position <= 1000:
+        css_class, title, icon_class, icon = 'top-rank-9-1000', 'Faceit Challenger 9-1000', 'fc-4-9', 'images/No.4-1000.svg'
+    else:
+        return None
+    return {'css_class': css_class, 'title': title, 'icon_class': icon_class, 'icon': icon}
+
+
+def average_cells(averages, trend=None):
+    """ Ячейки блока средних: K/D/A, K/D, K/R, HS% со стрелкой тренда """
+    if averages is None:
+        return None
+    trend = trend or {}
+    return [
+        {'label': 'K/D/A', 'trend': trend.get('avg_kills'),
+         'value': f"{averages['avg_kills']}/{averages['avg_deaths']}/{averages['avg_assists']}"},
+        {'label': 'K/D', 'trend': trend.get('avg_kd_ratio'), 'value': round(averages['avg_kd_ratio'], 2)},
+        {'label': 'K/R', 'trend': trend.get('avg_kr_ratio'), 'value': round(averages['avg_kr_ratio'], 2)},
+        {'label': 'HS%', 'trend': trend.get('avg_hs_procent'), 'value': f"{averages['avg_hs_procent']}%"},
+    ]
+
+
+def build_average_windows(match_stats):
+    """ Средние по окнам AVERAGE_WINDOWS: последние матчи со стрелками тренда и предыдущие """
+    windows = []
+    for size in AVERAGE_WINDOWS:
+        trend = match_stats.trend(size) if match_stats is not None else None
+        windows.append({
+            'size': size,
+            'last': average_cells(match_stats.averages(size), trend) if trend else None,
+            'prev': average_cells(match_stats.averages(size, start_index=size)) if match_stats is not None else None,
+        })
+    return windows
+
+
+def build_match_rows(items, current_time=None):
+    """ Строки истории матчей: все подписи и даты считаются один раз, шаблону остаётся подстановка """
+    current_time = current_time or datetime.utcnow()
+    rows = []
+    for item in items:
+        stats = item['stats']
+        map_name = stats['Map'].replace('de_', '')
+        result = {'0': 'loss', '1': 'win'}.get(stats.get('Result'))
+        has_deaths = parse_number(stats.get('Deaths')) != 0
+        rows.append({
+            'map_name': map_name,
+            'map_image': f'images/{map_name}.jpeg',
+            'result': result,
+            'result_label': {'loss': 'loss', 'win': 'Win'}.get(result),
+            'score': stats.get('Score'),
+            'kda': f"{stats.get('Kills')}-{stats.get('Deaths')}-{stats.get('Assists')}",
+            'kd': stats.get('K/D Ratio') if has_deaths else '..',
+            'kr': stats.get('K/R Ratio') if has_deaths else '..',
+            'time_since': format_time_since(stats.get('Updated At'), current_time),
+        })
+    return rows
+
+
+def build_map_segments(segments):
+    """ Сегменты 5v5 по картам актуального пула в фиксированном порядке """
+    filtered = [segment for segment in segments if segment['mode'] == '5v5' and segment['label'] in MAP_ORDER]
+    filtered.sort(key=lambda segment: MAP_ORDER[segment['label']])
+    return [{
+        'label': segment['label'],
+        'image': segment.get('img_small'),
+        'matches': segment['stats'].get('Matches'),
+        'win_rate': segment['stats'].get('Win Rate %'),
+        'kills': segment['stats'].get('Average Kills'),
+        'deaths': segment['stats'].get('Average Deaths'),
+        'assists': segment['stats'].get('Average Assists'),
+        'kd': segment['stats'].get('Average K/D Ratio'),
+        'kr': segment['stats'].get('Average K/R Ratio'),
+        'triple': segment['stats'].get('Average Triple Kills'),
+        'quadro': segment['stats'].get('Average Quadro Kills'),
+        'penta': segment['stats'].get('Average Penta Kills'),
+    } for segment in filtered]
+
+
+def build_profile_header(player_info_data):
+    """ Шапка страницы, для которой достаточно одного запроса профиля """
+    cs2 = player_info_data.get('games', {}).get('cs2', {})
+    skill_level = cs2.get('skill_level')
+    return {
+        'nickname': player_info_data['nickname'],
+        'avatar': player_info_data.get('avatar') or None,
+        'country': player_info_data['country'],
+        'region': cs2.get('region'),
+        'region_flag': 'region' + str(cs2.get('region', '')).lower(),
+        'country_flag': player_info_data['country'].lower(),
+        'elo': cs2.get('faceit_elo'),
+        'skill_level_icon': f'images/{skill_level}.svg' if skill_level is not None else None,
+        'activated_at': format_date(player_info_data['activated_at']),
+    }
+
+
+def build_ranks(player_global_rank, player_country_rank):
+    return {
+        'global_rank': format_rank(player_global_rank),
+        'global_rank_tier': rank_tier(player_global_rank),
+        'country_rank': format_rank(player_country_rank),
+    }
+
+
+def build_lifetime(full_player_stats_data):
+    lifetime = full_player_stats_data['lifetime']
+    return {
+        'recent_results': [('W' if result == '1' else 'L', result) for result in lifetime.get('Recent Results') or []],
+        'main_statistics': calculate_cs2_statistics(full_player_stats_data),
+        'lifetime': lifetime,
+    }
+
+
+def build_history(player_stats_data):
+    match_stats = MatchStats.from_stats_data(player_stats_data)
+    return {
+        'average_windows': build_average_windows(match_stats),
+        'matches': build_match_rows(player_stats_data['items']),
+    }
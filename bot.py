@@ -1,11 +1,35 @@
+import logging
+import time
 from typing import Final
 from telegram import Update, KeyboardButton, ReplyKeyboardMarkup, ReplyKeyboardRemove
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
-from app.models import Player, get_player_stats, search_by_steamid_64, format_date, calculate_averages, calculate_cs2_statistics
-from app import app
-
-TOKEN: Final = app.config['TELEGRAM_API_KEY']
+from telegram.ext import Application, CommandHandler, MessageHandler, TypeHandler, filters, ContextTypes
+from faceit_core.session_store import PlayerSessionStore
+from faceit_core import async_api
+from faceit_core.lobby import LobbyError
+from faceit_core import deadline
+from faceit_core import metrics
+from faceit_core.settings import settings
+
+TOKEN: Final = settings['TELEGRAM_API_KEY']
 BOT_USERNAME: Final = '@Faceit_helper_bot'
+CONCURRENT_UPDATES: Final = settings['BOT_CONCURRENT_UPDATES']
+TELEGRAM_API_URL: Final = settings['TELEGRAM_API_URL']
+BOT_MODE: Final = settings['BOT_MODE']
+POLL_INTERVAL: Final = settings['BOT_POLL_INTERVAL']
+WEBHOOK_LISTEN: Final = settings['WEBHOOK_LISTEN']
+WEBHOOK_PORT: Final = settings['WEBHOOK_PORT']
+WEBHOOK_PATH: Final = settings['WEBHOOK_PATH']
+WEBHOOK_URL: Final = settings['WEBHOOK_URL']
+WEBHOOK_SECRET: Final = settings['WEBHOOK_SECRET']
+UPDATE_BUDGET: Final = settings['BOT_UPDATE_BUDGET']
+METRICS_PORT: Final = settings['BOT_METRICS_PORT']
+METRICS_ADDR: Final = settings['BOT_METRICS_ADDR']
+# карт команды в ответе /lobby
+LOBBY_TOP_MAPS: Final = 3
+
+logger = logging.getLogger(__name__)
+player_sessions = PlayerSessionStore(max_bytes=settings['BOT_SESSION_MAX_BYTES'], ttl=settings['BOT_SESSION_TTL'])
+metrics.register_cache('bot_sessions', player_sessions.stats)
 
 # Markups
 start_markup = ReplyKeyboardMarkup(
@@ -34,20 +58,21 @@ avg_stats_markup = ReplyKeyboardMarkup(
 async def player_info(update: Update, context: ContextTypes.DEFAULT_TYPE, text):
     search_value = text
     try:
-        player_info_data, _, nickname, player_global_rank, player_country_rank = search_by_steamid_64(search_value)
+        player_info_data, player_stats_data, full_player_stats_data, player_global_rank, player_country_rank = await async_api.fetch_player_profile(search_value, limit=0)
 
         if player_info_data and 'player_id' in player_info_data:
-            player_stats_data, full_player_stats_data = get_player_stats(player_info_data['player_id'], limit=200)
-            context.user_data['player_data'] = {'info': player_info_data, 'stats': player_stats_data}
+            nickname = player_info_data['nickname']
+            context.user_data['player_id'] = player_info_data['player_id']
 
             # Extract and format data
-            lifetime_data = full_player_stats_data.get('lifetime', [{}])
+            # ранги и общая статистика могли не уложиться в бюджет апдейта — тогда показываем N/A
+            lifetime_data = (full_player_stats_data or {}).get('lifetime', {})
             games_data = player_info_data.get('games', {}).get('cs2', {})
 
             response_message = (
                 f"Nickname: {nickname} \n"
-                f"{player_info_data['games']['cs2']['region'].upper()} rank: #{player_global_rank}\n"
-                f"{player_info_data['country'].upper()} rank: #{player_country_rank}\n"
+                f"{player_info_data['games']['cs2']['region'].upper()} rank: #{player_global_rank or 'N/A'}\n"
+                f"{player_info_data['country'].upper()} rank: #{player_country_rank or 'N/A'}\n"
                 f"ELO: {games_data.get('faceit_elo', 'N/A')}\n\n"
                 f"K/D: {lifetime_data.get('Average K/D Ratio', 'N/A')}\n"
                 f"HS: {lifetime_data.get('Average Headshots %', 'N/A')}%\n"
@@ -69,10 +94,21 @@ async def player_info(update: Update, context: ContextTypes.DEFAULT_TYPE, text):
         print(f"Error handling message: {str(e)}") 
 
 async def player_avg_stats(update: Update, context: ContextTypes.DEFAULT_TYPE, avg_index: int):
-    player_data = context.user_data.get('player_data')
-    if player_data:
-        averages_last = calculate_averages(player_data['stats'], avg_index)
-        averages_prev = calculate_averages(player_data['stats'], avg_index, start_index=avg_index)
+    player_id = context.user_data.get('player_id')
+    match_stats = player_sessions.get(player_id)
+    # для сравнения нужны последние и предыдущие avg_index матчей — догружаем историю только до этой глубины,
+    # если сохранённая история игрока не полная (у новых игроков матчей может быть меньше 2 * avg_index)
+    if player_id and (match_stats is None or (match_stats.count < 2 * avg_index and not match_stats.complete)):
+        try:
+            match_stats = await async_api.get_match_stats(player_id, 2 * avg_index)
+        except Exception as e:
+            await update.message.reply_text(f"An error occurred: {str(e)}")
+            logger.warning(f"Error loading match history: {e}")
+            return
+        player_sessions.put(player_id, match_stats)
+
+    if match_stats:
+        averages_last, averages_prev = match_stats.compare(avg_index)
 
         if averages_last is None or averages_prev is None:
             await update.message.reply_text('Error calculating averages. Please try again.', reply_markup=ReplyKeyboardRemove())
@@ -97,20 +133,12 @@ async def add_more_20_player_command(update: Update, context: ContextTypes.DEFAU
     offset += 20
     context.user_data['offset'] = offset
 
-    if region == 'eu':
-        rankings = Player.get_global_eu_ranking(limit=20, offset=offset)
-    elif region == 'na':
-        rankings = Player.get_global_na_ranking(limit=20, offset=offset)
-    elif region == 'sa':
-        rankings = Player.get_global_sa_ranking(limit=20, offset=offset)
-    elif region == 'sea':
-        rankings = Player.get_global_sea_ranking(limit=20, offset=offset)
-    elif region == 'oce':
-        rankings = Player.get_global_oce_ranking(limit=20, offset=offset)
-    else:
+    if region not in ('eu', 'na', 'sa', 'sea', 'oce'):
         await update.message.reply_text('Region not recognized.', reply_markup=ReplyKeyboardRemove())
         return
 
+    rankings = await async_api.get_global_ranking(region, limit=20, offset=offset)
+
     await output_top(update, context, rankings, region)
 
 async def output_top(update: Update, context: ContextTypes.DEFAULT_TYPE, rankings: list, region: str):
@@ -128,6 +156,37 @@ async def output_top(update: Update, context: ContextTypes.DEFAULT_TYPE, ranking
     await update.message.reply_text(response_message, reply_markup=add_more_20_player_markup)
 
 
+def format_value(value, suffix='', digits=2):
+    return 'N/A' if value is None else f"{value:.{digits}f}{suffix}" if isinstance(value, float) else f"{value}{suffix}"
+
+
+def format_lobby(lobby):
+    """ Сравнение команд лобби одним сообщением: средние команды и строка на каждого игрока """
+    lines = [f"Lobby, recent = last {lobby['history_depth']} matches\n"]
+    for team in lobby['teams']:
+        summary = team['summary']
+        lines.append(
+            f"{team['name']}: ELO {format_value(summary['avg_elo'], digits=0)}, K/D {format_value(summary['avg_kd_ratio'])}, "
+            f"WR {format_value(summary['avg_win_rate'], '%', digits=0)}, recent K/D {format_value(summary['recent_kd_ratio'])}"
+        )
+        if summary['recent_maps']:
+            maps = ', '.join(f"{row['map'].replace('de_', '')} {row['matches']} (K/D {format_value(row['avg_kd_ratio'])})"
+                             for row in summary['recent_maps'][:LOBBY_TOP_MAPS])
+            lines.append(f"  Maps: {maps}")
+        for player in team['players']:
+            lifetime = player['lifetime'] or {}
+            recent = player['recent'] or {}
+            lines.append(
+                f"  {player['nickname']}: ELO {format_value(player['elo'])}, "
+                f"K/D {format_value(lifetime.get('Average K/D Ratio'))}, "
+                f"recent K/D {format_value(recent.get('avg_kd_ratio'))}, HS {format_value(recent.get('avg_hs_procent'), '%')}"
+            )
+        lines.append('')
+    if lobby['unresolved']:
+        lines.append(f"Not found: {', '.join(lobby['unresolved'])}")
+    return '\n'.join(lines).strip()
+
+
 # Commands
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(
@@ -159,6 +218,26 @@ async def last_50_avg_command(update: Update, context: ContextTypes.DEFAULT_TYPE
 async def last_100_avg_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await player_avg_stats(update, context, avg_index=100)
 
+async def lobby_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    parts = update.message.text.split(None, 1)
+    if len(parts) < 2:
+        await update.message.reply_text(
+            'Send /lobby with a FACEIT match id / room link, or up to 10 nicknames / Steam links '
+            '(separate the teams with "vs" or an empty line).',
+            reply_markup=ReplyKeyboardRemove()
+        )
+        return
+    try:
+        lobby = await async_api.fetch_lobby(parts[1])
+    except LobbyError as e:
+        await update.message.reply_text(str(e), reply_markup=ReplyKeyboardRemove())
+        return
+    except Exception as e:
+        await update.message.reply_text(f"An error occurred: {str(e)}")
+        logger.exception("Error loading lobby")
+        return
+    await update.message.reply_text(format_lobby(lobby), reply_markup=ReplyKeyboardRemove())
+
 async def top_players_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(
         'Choose region', reply_markup=select_region_markup
@@ -167,31 +246,31 @@ async def top_players_command(update: Update, context: ContextTypes.DEFAULT_TYPE
 async def eu_top_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data['region'] = 'eu'
     context.user_data['offset'] = 0 
-    rankings = Player.get_global_eu_ranking(limit=20)
+    rankings = await async_api.get_global_ranking('EU', limit=20)
     await output_top(update, context, rankings, region='EU')
 
 async def na_top_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data['region'] = 'na'
     context.user_data['offset'] = 0 
-    rankings = Player.get_global_na_ranking(limit=20)
+    rankings = await async_api.get_global_ranking('NA', limit=20)
     await output_top(update, context, rankings, region='NA')
 
 async def sa_top_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data['region'] = 'sa'
     context.user_data['offset'] = 0 
-    rankings = Player.get_global_sa_ranking(limit=20)
+    rankings = await async_api.get_global_ranking('SA', limit=20)
     await output_top(update, context, rankings, region='SA')
 
 async def sea_top_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data['region'] = 'sea'
     context.user_data['offset'] = 0 
-    rankings = Player.get_global_sea_ranking(limit=20)
+    rankings = await async_api.get_global_ranking('SEA', limit=20)
     await output_top(update, context, rankings, region='SEA')
 
 async def oce_top_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data['region'] = 'oce'
     context.user_data['offset'] = 0 
-    rankings = Player.get_global_oce_ranking(limit=20)
+    rankings = await async_api.get_global_ranking('OCE', limit=20)
     await output_top(update, context, rankings, region='OCE')
 
 
@@ -205,6 +284,29 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await player_info(update, context, text)
 
 
+# Deadline
+async def start_update_deadline(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """ Дедлайн на обработку апдейта: запросы к API во всех хендлерах укладываются в UPDATE_BUDGET """
+    deadline.start(UPDATE_BUDGET)
+
+
+# Metrics
+def timed(command, callback):
+    """ Хендлер с замером времени обработки и исходом по команде """
+    async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        started_at = time.perf_counter()
+        outcome = 'ok'
+        try:
+            await callback(update, context)
+        except Exception:
+            outcome = 'error'
+            raise
+        finally:
+            metrics.bot_update_seconds.observe(time.perf_counter() - started_at, command)
+            metrics.bot_updates.inc(command, outcome)
+    return handler
+
+
 # Errors
 async def error(update: Update, context: ContextTypes.DEFAULT_TYPE):
     print(f"Update {update} caused error {context.error}")
@@ -212,30 +314,51 @@ async def error(update: Update, context: ContextTypes.DEFAULT_TYPE):
 if __name__ == '__main__':
     print('Starting...')
 
-    app = Application.builder().token(TOKEN).build()
+    app = Application.builder().token(TOKEN).base_url(TELEGRAM_API_URL).concurrent_updates(CONCURRENT_UPDATES).build()
+
+    # Deadline (group -1 runs before every other handler of the update)
+    app.add_handler(TypeHandler(Update, start_update_deadline), group=-1)
 
     # Commands
-    app.add_handler(CommandHandler('start', start_command))
-    app.add_handler(CommandHandler('help', help_command))
-    app.add_handler(CommandHandler('find_player', find_player_command))
-    app.add_handler(CommandHandler('top_players', top_players_command))
-    app.add_handler(CommandHandler('eu', eu_top_command))
-    app.add_handler(CommandHandler('na', na_top_command))
-    app.add_handler(CommandHandler('sa', sa_top_command))
-    app.add_handler(CommandHandler('sea', sea_top_command))
-    app.add_handler(CommandHandler('oce', oce_top_command))
-    app.add_handler(CommandHandler('add_more_20_player', add_more_20_player_command))
-    app.add_handler(CommandHandler('back', back_command))
-    app.add_handler(CommandHandler('last_10_avg', last_10_avg_command))
-    app.add_handler(CommandHandler('last_20_avg', last_20_avg_command))
-    app.add_handler(CommandHandler('last_50_avg', last_50_avg_command))
-    app.add_handler(CommandHandler('last_100_avg', last_100_avg_command))
+    app.add_handler(CommandHandler('start', timed('start', start_command)))
+    app.add_handler(CommandHandler('help', timed('help', help_command)))
+    app.add_handler(CommandHandler('find_player', timed('find_player', find_player_command)))
+    app.add_handler(CommandHandler('top_players', timed('top_players', top_players_command)))
+    app.add_handler(CommandHandler('eu', timed('eu', eu_top_command)))
+    app.add_handler(CommandHandler('na', timed('na', na_top_command)))
+    app.add_handler(CommandHandler('sa', timed('sa', sa_top_command)))
+    app.add_handler(CommandHandler('sea', timed('sea', sea_top_command)))
+    app.add_handler(CommandHandler('oce', timed('oce', oce_top_command)))
+    app.add_handler(CommandHandler('add_more_20_player', timed('add_more_20_player', add_more_20_player_command)))
+    app.add_handler(CommandHandler('back', timed('back', back_command)))
+    app.add_handler(CommandHandler('last_10_avg', timed('last_10_avg', last_10_avg_command)))
+    app.add_handler(CommandHandler('last_20_avg', timed('last_20_avg', last_20_avg_command)))
+    app.add_handler(CommandHandler('last_50_avg', timed('last_50_avg', last_50_avg_command)))
+    app.add_handler(CommandHandler('last_100_avg', timed('last_100_avg', last_100_avg_command)))
+    app.add_handler(CommandHandler('lobby', timed('lobby', lobby_command)))
 
     # Messages
-    app.add_handler(MessageHandler(filters.TEXT & (~filters.COMMAND), handle_message))
+    app.add_handler(MessageHandler(filters.TEXT & (~filters.COMMAND), timed('message', handle_message)))
 
     # Log all errors
     app.add_error_handler(error)
 
-    print('Polling...')
-    app.run_polling(poll_interval=5)
\ No newline at end of file
+    if METRICS_PORT:
+        metrics.start_http_server(METRICS_PORT, METRICS_ADDR)
+        print(f'Metrics on http://{METRICS_ADDR}:{METRICS_PORT}/metrics')
+
+    if BOT_MODE == 'webhook':
+        if not WEBHOOK_SECRET:
+            raise SystemExit('WEBHOOK_SECRET must be set when BOT_MODE=webhook')
+
+        print('Webhook...')
+        app.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=WEBHOOK_URL,
+            secret_token=WEBHOOK_SECRET,
+        )
+    else:
+        print('Polling...')
+        app.run_polling(poll_interval=POLL_INTERVAL)
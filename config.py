@@ -2,5 +2,94 @@ import os
 
 class Config:
     FACEIT_API_KEY = os.environ.get('FACEIT_API_KEY')
-    STEAM_API_KEY = os.environ.get('STEAM_API_KEY')  
-    TELEGRAM_API_KEY = os.environ.get('TELEGRAM_API_KEY') 
\ No newline at end of file
+    STEAM_API_KEY = os.environ.get('STEAM_API_KEY')
+    TELEGRAM_API_KEY = os.environ.get('TELEGRAM_API_KEY')
+
+    # HTTP client
+    FACEIT_API_URL = os.environ.get('FACEIT_API_URL', 'https://open.faceit.com/data/v4')
+    STEAM_API_URL = os.environ.get('STEAM_API_URL', 'http://api.steampowered.com')
+    FACEIT_POOL_SIZE = int(os.environ.get('FACEIT_POOL_SIZE', 20))
+    STEAM_POOL_SIZE = int(os.environ.get('STEAM_POOL_SIZE', 10))
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 3))
+    HTTP_BACKOFF_BASE = float(os.environ.get('HTTP_BACKOFF_BASE', 0.5))
+    HTTP_BACKOFF_MAX = float(os.environ.get('HTTP_BACKOFF_MAX', 10))
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+    HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 10))
+    FACEIT_RATE_LIMIT = float(os.environ.get('FACEIT_RATE_LIMIT', 10))
+    FACEIT_RATE_BURST = int(os.environ.get('FACEIT_RATE_BURST', 20))
+    # число процессов с одним ключом FACEIT: лимит и запас делятся между ними (gunicorn.conf.py ставит число воркеров)
+    FACEIT_RATE_PROCESSES = int(os.environ.get('FACEIT_RATE_PROCESSES', 1))
+
+    # Concurrency
+    FETCH_WORKERS = int(os.environ.get('FETCH_WORKERS', 16))
+
+    # Ranking cache
+    RANKING_CACHE_SIZE = int(os.environ.get('RANKING_CACHE_SIZE', 256))
+    RANKING_CACHE_TTL = int(os.environ.get('RANKING_CACHE_TTL', 300))
+    RANKING_CACHE_STALE_TTL = int(os.environ.get('RANKING_CACHE_STALE_TTL', 3600))
+
+    # Leaderboard snapshot
+    LEADERBOARD_REFRESH_ENABLED = os.environ.get('LEADERBOARD_REFRESH_ENABLED', '1') == '1'
+    LEADERBOARD_REGIONS = ['EU', 'NA', 'SA', 'SEA', 'OCE']
+    LEADERBOARD_DEPTH = int(os.environ.get('LEADERBOARD_DEPTH', 1000))
+    LEADERBOARD_REFRESH_INTERVAL = int(os.environ.get('LEADERBOARD_REFRESH_INTERVAL', 300))
+
+    # Match history store
+    MATCH_STORE_MAX_BYTES = int(os.environ.get('MATCH_STORE_MAX_BYTES', 32 * 1024 * 1024))
+    MATCH_STORE_PROBE_SIZE = int(os.environ.get('MATCH_STORE_PROBE_SIZE', 20))
+    MATCH_HISTORY_MAX_DEPTH = int(os.environ.get('MATCH_HISTORY_MAX_DEPTH', 1000))
+
+    # Telegram bot
+    BOT_SESSION_MAX_BYTES = int(os.environ.get('BOT_SESSION_MAX_BYTES', 32 * 1024 * 1024))
+    BOT_SESSION_TTL = int(os.environ.get('BOT_SESSION_TTL', 3600))
+    BOT_CONCURRENT_UPDATES = int(os.environ.get('BOT_CONCURRENT_UPDATES', 64))
+    ASYNC_EXECUTOR_WORKERS = int(os.environ.get('ASYNC_EXECUTOR_WORKERS', 32))
+    TELEGRAM_API_URL = os.environ.get('TELEGRAM_API_URL', 'https://api.telegram.org/bot')
+    BOT_MODE = os.environ.get('BOT_MODE', 'polling')
+    BOT_POLL_INTERVAL = float(os.environ.get('BOT_POLL_INTERVAL', 5))
+    WEBHOOK_LISTEN = os.environ.get('WEBHOOK_LISTEN', '127.0.0.1')
+    WEBHOOK_PORT = int(os.environ.get('WEBHOOK_PORT', 8443))
+    WEBHOOK_PATH = os.environ.get('WEBHOOK_PATH', 'telegram')
+    WEBHOOK_URL = os.environ.get('WEBHOOK_URL')
+    WEBHOOK_SECRET = os.environ.get('WEBHOOK_SECRET')
+
+    # Identity index
+    IDENTITY_INDEX_ENABLED = os.environ.get('IDENTITY_INDEX_ENABLED', '1') == '1'
+    IDENTITY_DB_PATH = os.environ.get('IDENTITY_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'identity.sqlite3'))
+    IDENTITY_NICKNAME_TTL = int(os.environ.get('IDENTITY_NICKNAME_TTL', 86400))
+    IDENTITY_STEAM_TTL = int(os.environ.get('IDENTITY_STEAM_TTL', 30 * 86400))
+
+    # Steam batching
+    STEAM_BATCH_WINDOW = float(os.environ.get('STEAM_BATCH_WINDOW', 0.02))
+
+    # Not-found cache
+    NOT_FOUND_CACHE_SIZE = int(os.environ.get('NOT_FOUND_CACHE_SIZE', 4096))
+    NOT_FOUND_CACHE_TTL = int(os.environ.get('NOT_FOUND_CACHE_TTL', 300))
+
+    # Page cache
+    PAGE_CACHE_SIZE = int(os.environ.get('PAGE_CACHE_SIZE', 256))
+    PAGE_CACHE_TTL = int(os.environ.get('PAGE_CACHE_TTL', 60))
+
+
+    # Player page streaming
+    PLAYER_PAGE_STREAMING = os.environ.get('PLAYER_PAGE_STREAMING', '1') == '1'
+
+    # Leaderboard API
+    LEADERBOARD_API_MAX_LIMIT = int(os.environ.get('LEADERBOARD_API_MAX_LIMIT', 100))
+    LEADERBOARD_API_MAX_AGE = int(os.environ.get('LEADERBOARD_API_MAX_AGE', 60))
+
+    # Shared cache (redis://host:6379/0); empty - caches stay per process
+    CACHE_BACKEND_URL = os.environ.get('CACHE_BACKEND_URL', '')
+
+    # Request deadline (seconds per web request / bot update, 0 - only per-call timeouts)
+    REQUEST_BUDGET = float(os.environ.get('REQUEST_BUDGET', 8))
+    BOT_UPDATE_BUDGET = float(os.environ.get('BOT_UPDATE_BUDGET', 15))
+
+    # Metrics (/metrics on the web app; the bot serves its own on BOT_METRICS_PORT, 0 - off)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    BOT_METRICS_PORT = int(os.environ.get('BOT_METRICS_PORT', 9101))
+    BOT_METRICS_ADDR = os.environ.get('BOT_METRICS_ADDR', '127.0.0.1')
+
+    # Lobby analyzer (match id or up to LOBBY_MAX_PLAYERS nicknames / Steam links)
+    LOBBY_MAX_PLAYERS = int(os.environ.get('LOBBY_MAX_PLAYERS', 10))
+    LOBBY_HISTORY_DEPTH = int(os.environ.get('LOBBY_HISTORY_DEPTH', 20))
\ No newline at end of file
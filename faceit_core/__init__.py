@@ -0,0 +1,18 @@
+""" Ядро Faceit helper без веб-фреймворка: доступ к FACEIT/Steam API, кэши и расчёт статистики.
+
+Общее для сайта (app), Telegram-бота (bot.py) и пакетных задач. Подмодули загружаются
+при первом обращении (faceit_core.players, faceit_core.stats, ...), поэтому импорт пакета
+ничего не тянет; настройки — faceit_core.settings.
+"""
+import importlib
+
+SUBMODULES = (
+    'async_api', 'cache', 'client', 'deadline', 'identity', 'leaderboard', 'lobby', 'match_store', 'metrics',
+    'players', 'session_store', 'settings', 'shared_cache', 'singleflight', 'stats', 'stats_engine', 'steam_batch',
+)
+
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
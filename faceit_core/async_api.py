@@ -0,0 +1,37 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from faceit_core.settings import settings
+from faceit_core import deadline
+from faceit_core import lobby
+from faceit_core.players import Player, load_player_profile, normalize_lookup, profile_flight, match_store
+from faceit_core.stats_engine import MatchStats
+
+executor = ThreadPoolExecutor(max_workers=settings['ASYNC_EXECUTOR_WORKERS'], thread_name_prefix='async-api')
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """ Выполнение блокирующей функции в ограниченном пуле, не блокируя event loop (с дедлайном апдейта) """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, deadline.bind(fn, *args, **kwargs))
+
+
+async def fetch_player_profile(search_value, limit=200):
+    search_value = search_value.strip()
+    key = ('profile', normalize_lookup(search_value), limit)
+    return await profile_flight.do_async(key, deadline.bind(load_player_profile, search_value, limit),
+                                        executor=executor)
+
+
+async def get_match_stats(player_id, limit):
+    """ MatchStats по последним limit матчам: страницы истории догружаются только до нужной глубины """
+    limit = min(limit, settings['MATCH_HISTORY_MAX_DEPTH'])
+    return MatchStats.from_stats_data(await run_blocking(match_store.get, player_id, limit))
+
+
+async def get_global_ranking(region, limit=100, offset=0):
+    return await run_blocking(Player.get_global_ranking, region.upper(), limit, offset)
+
+
+async def fetch_lobby(text, limit=None):
+    return await run_blocking(lobby.fetch_lobby, text, limit)
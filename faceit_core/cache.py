@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cachetools import LRUCache, TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class EvictionCounter:
+    """ Примесь к кэшам cachetools: считает вытеснения из-за ограничения размера (не истечение TTL) """
+    evictions = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+
+class CountingLRUCache(EvictionCounter, LRUCache):
+    pass
+
+
+class CountingTTLCache(EvictionCounter, TTLCache):
+    pass
+
+
+class StaleWhileRevalidateCache:
+    """ Кэш с TTL, LRU-вытеснением и фоновым обновлением устаревших записей.
+
+    Свежая запись (моложе ttl) отдаётся сразу. Устаревшая, но моложе ttl + stale_ttl,
+    тоже отдаётся сразу, а обновление запускается в фоне. Ошибки загрузки не кэшируются:
+    если есть любая старая запись, она отдаётся вместо ошибки.
+
+    С общим бэкендом (shared) записи видны всем процессам: локальный промах сначала
+    проверяется там, а каждая загрузка туда публикуется.
+    """
+
+    def __init__(self, maxsize, ttl, stale_ttl=0, executor=None, shared=None, namespace='swr'):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.entries = CountingLRUCache(maxsize=maxsize)
+        self.refreshing = set()
+        self.lock = threading.Lock()
+        self.executor = executor or ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-refresh')
+        self.shared = shared
+        self.namespace = namespace
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, key, loader):
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None and self.shared is not None:
+            entry = self.shared.get(self.namespace, key)
+            if entry is not None:
+                with self.lock:
+                    self.entries[key] = entry
+
+        if entry is not None:
+            value, stored_at = entry
+            age = now - stored_at
+            if age < self.ttl:
+                with self.lock:
+                    self.hits += 1
+                return value
+            if age < self.ttl + self.stale_ttl:
+                with self.lock:
+                    self.stale_hits += 1
+                self.refresh(key, loader)
+                return value
+
+        with self.lock:
+            self.misses += 1
+        try:
+            value = loader()
+        except Exception:
+            if entry is not None:
+                return entry[0]
+            raise
+        self.set(key, value)
+        return value
+
+    def set(self, key, value):
+        entry = (value, time.time())
+        with self.lock:
+            self.entries[key] = entry
+        if self.shared is not None:
+            self.shared.set(self.namespace, key, entry, self.ttl + self.stale_ttl)
+
+    def fresh_shared_entry(self, key):
+        """ Запись, которую уже обновил другой процесс, или None """
+        if self.shared is None:
+            return None
+        entry = self.shared.get(self.namespace, key)
+        if entry is not None and time.time() - entry[1] < self.ttl:
+            return entry
+        return None
+
+    def refresh(self, key, loader):
+        """ Фоновое обновление записи (не более одного на ключ) """
+        with self.lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+
+        def run():
+            try:
+                entry = self.fresh_shared_entry(key)
+                if entry is not None:
+                    with self.lock:
+                        self.entries[key] = entry
+                    return
+                self.set(key, loader())
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {key}: {e}")
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        self.executor.submit(run)
+
+    def stats(self):
+        """ Устаревшие записи, отданные во время фонового обновления, входят в hits """
+        with self.lock:
+            return {'hits': self.hits + self.stale_hits, 'stale_hits': self.stale_hits, 'misses': self.misses,
+                    'evictions': self.entries.evictions, 'size': len(self.entries)}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
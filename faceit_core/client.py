@@ -0,0 +1,188 @@
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from faceit_core.settings import settings
+from faceit_core import deadline
+from faceit_core import metrics
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# player_id / match_id FACEIT (uuid, у матчей с префиксом "1-") и SteamID64
+ID_SEGMENT_RE = re.compile(r'^(\d+-)?[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$|^\d{6,}$', re.I)
+
+
+def endpoint_name(path):
+    """ Путь запроса без идентификаторов — метка эндпоинта в метриках: players/{id}/stats/cs2 """
+    return '/'.join('{id}' if ID_SEGMENT_RE.match(segment) else segment for segment in path.strip('/').split('/'))
+
+
+class TokenBucket:
+    """ Ограничитель частоты запросов (token bucket) """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """ Ожидание токена; False, если его не получить за timeout секунд """
+        started_at = time.monotonic()
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if timeout is not None and now - started_at + wait > timeout:
+                return False
+            time.sleep(wait)
+
+
+class ApiClient:
+    """ Пул keep-alive соединений к одному API с повторами и backoff.
+
+    Каждый вызов ограничен таймаутом (connect, read), а внутри входящего запроса — ещё и его
+    оставшимся бюджетом (faceit_core.deadline): ожидание лимита, попытки и паузы между ними в него укладываются.
+    """
+
+    def __init__(self, base_url, pool_size=10, max_retries=3, backoff_base=0.5, backoff_max=10,
+                 headers=None, rate_limiter=None, timeout=(3.05, 10), name='api'):
+        self.base_url = base_url.rstrip('/')
+        self.name = name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = rate_limiter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def get(self, path, params=None, **kwargs):
+        url = f'{self.base_url}/{path.lstrip("/")}'
+        endpoint = endpoint_name(path)
+        timeout = kwargs.pop('timeout', self.timeout)
+        attempt = 0
+        while True:
+            if deadline.remaining() == 0:
+                raise self.deadline_exceeded(endpoint, f"Request deadline exceeded before GET {path}")
+            if self.rate_limiter and not self.rate_limiter.acquire(deadline.remaining()):
+                raise self.deadline_exceeded(endpoint, f"Request deadline exceeded waiting for rate limit: GET {path}")
+            try:
+                response = self.send(url, endpoint, params=params, timeout=deadline.clamp(timeout), **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                self.sleep_before_retry(self.backoff_delay(attempt), path, endpoint)
+                attempt += 1
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                return response
+
+            # Retry-After выдерживается целиком: раньше сервер всё равно ответит 429; не укладывается в бюджет — ошибка сразу
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = self.backoff_delay(attempt)
+            self.sleep_before_retry(delay, path, endpoint, response.status_code)
+            attempt += 1
+
+    def send(self, url, endpoint, **kwargs):
+        """ Одна попытка запроса с замером длительности и учётом статуса или ошибки """
+        started_at = time.perf_counter()
+        try:
+            response = self.session.get(url, **kwargs)
+        except requests.exceptions.Timeout:
+            metrics.upstream_errors.inc(self.name, endpoint, 'timeout')
+            raise
+        except requests.exceptions.ConnectionError:
+            metrics.upstream_errors.inc(self.name, endpoint, 'connection')
+            raise
+        finally:
+            metrics.upstream_seconds.observe(time.perf_counter() - started_at, self.name, endpoint)
+        metrics.upstream_responses.inc(self.name, endpoint, str(response.status_code))
+        return response
+
+    def deadline_exceeded(self, endpoint, message):
+        metrics.upstream_errors.inc(self.name, endpoint, 'deadline')
+        return deadline.DeadlineExceeded(message)
+
+    def sleep_before_retry(self, delay, path, endpoint, status=None):
+        """ Пауза перед повтором; если она не укладывается в бюджет запроса, повтора не будет """
+        left = deadline.remaining()
+        if left is not None and delay >= left:
+            reason = f" (last status {status})" if status else ''
+            raise self.deadline_exceeded(endpoint, f"Request deadline exceeded before retrying GET {path}{reason}")
+        time.sleep(delay)
+
+    def backoff_delay(self, attempt):
+        """ Экспоненциальная задержка с full jitter """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+def retry_after_seconds(response):
+    """ Разбор заголовка Retry-After (секунды или HTTP-дата) """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def faceit_client():
+    """ Общий клиент FACEIT Data API; лимит частоты ключа делится между процессами """
+    with _clients_lock:
+        if 'faceit' not in _clients:
+            processes = max(1, settings['FACEIT_RATE_PROCESSES'])
+            _clients['faceit'] = ApiClient(
+                settings['FACEIT_API_URL'],
+                pool_size=settings['FACEIT_POOL_SIZE'],
+                max_retries=settings['HTTP_MAX_RETRIES'],
+                backoff_base=settings['HTTP_BACKOFF_BASE'],
+                backoff_max=settings['HTTP_BACKOFF_MAX'],
+                headers={'Authorization': f"Bearer {settings['FACEIT_API_KEY']}"},
+                rate_limiter=TokenBucket(settings['FACEIT_RATE_LIMIT'] / processes,
+                                         max(1, settings['FACEIT_RATE_BURST'] // processes)),
+                timeout=(settings['HTTP_CONNECT_TIMEOUT'], settings['HTTP_READ_TIMEOUT']),
+                name='faceit',
+            )
+        return _clients['faceit']
+
+
+def steam_client():
+    """ Общий клиент Steam Web API """
+    with _clients_lock:
+        if 'steam' not in _clients:
+            _clients['steam'] = ApiClient(
+                settings['STEAM_API_URL'],
+                pool_size=settings['STEAM_POOL_SIZE'],
+                max_retries=settings['HTTP_MAX_RETRIES'],
+                backoff_base=settings['HTTP_BACKOFF_BASE'],
+                backoff_max=settings['HTTP_BACKOFF_MAX'],
+                timeout=(settings['HTTP_CONNECT_TIMEOUT'], settings['HTTP_READ_TIMEOUT']),
+                name='steam',
+            )
+        return _clients['steam']
@@ -0,0 +1,69 @@
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import requests
+
+_deadline = contextvars.ContextVar('request_deadline', default=None)
+# ожидание результата чуть дольше бюджета: задачи с тем же дедлайном успевают вернуть частичный результат сами
+WAIT_GRACE = 0.25
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """ Бюджет времени входящего запроса исчерпан до или во время обращения к API """
+
+
+def start(budget):
+    """ Дедлайн текущего запроса (веб-запроса или апдейта бота) через budget секунд """
+    return _deadline.set(time.monotonic() + budget if budget else None)
+
+
+def reset(token):
+    _deadline.reset(token)
+
+
+def remaining():
+    """ Оставшийся бюджет в секундах или None, если дедлайн не задан """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def clamp(timeout):
+    """ Таймаут вызова (число или (connect, read)), урезанный до оставшегося бюджета """
+    left = remaining()
+    if left is None:
+        return timeout
+    # нулевой таймаут requests не принимает; истёкший дедлайн проверяется до вызова
+    left = max(left, 0.01)
+    if isinstance(timeout, tuple):
+        return tuple(min(value, left) for value in timeout)
+    return left if timeout is None else min(timeout, left)
+
+
+def wait_timeout():
+    """ Таймаут ожидания задач, запущенных в рамках текущего запроса """
+    left = remaining()
+    return None if left is None else left + WAIT_GRACE
+
+
+def wait(future):
+    """ Результат future, но не дольше оставшегося бюджета """
+    try:
+        return future.result(timeout=wait_timeout())
+    except FutureTimeoutError:
+        raise DeadlineExceeded("Request deadline exceeded while waiting for a result") from None
+
+
+def bind(fn, *args, **kwargs):
+    """ Вызов fn в копии текущего контекста (с тем же дедлайном) — для передачи в другие потоки """
+    return functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class ContextExecutor(ThreadPoolExecutor):
+    """ Пул потоков, задачи которого видят дедлайн запроса, поставившего их в очередь """
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(bind(fn, *args, **kwargs))
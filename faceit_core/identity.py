@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    player_id TEXT PRIMARY KEY,
+    nickname TEXT,
+    nickname_key TEXT,
+    steam_id_64 TEXT,
+    nickname_updated_at REAL,
+    steam_updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS players_nickname_key ON players (nickname_key);
+CREATE INDEX IF NOT EXISTS players_steam_id_64 ON players (steam_id_64);
+CREATE TABLE IF NOT EXISTS vanity_urls (
+    vanity_key TEXT PRIMARY KEY,
+    steam_id_64 TEXT,
+    updated_at REAL
+);
+"""
+
+
+class IdentityIndex:
+    """ Постоянный индекс соответствий никнейм FACEIT / vanity URL / SteamID64 / player_id.
+
+    Пополняется из каждого ответа API и из страниц рейтинга. Связь никнейма с игроком
+    устаревает быстрее (никнейм можно сменить), чем связь SteamID64 с игроком.
+    """
+
+    def __init__(self, path, nickname_ttl=86400, steam_ttl=30 * 86400):
+        self.path = path
+        self.nickname_ttl = nickname_ttl
+        self.steam_ttl = steam_ttl
+        self.local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+        return connection
+
+    def record_player(self, player_info_data):
+        """ Сохранение связей из профиля игрока FACEIT """
+        if not player_info_data or 'player_id' not in player_info_data:
+            return
+        steam_id_64 = (player_info_data.get('steam_id_64')
+                       or player_info_data.get('games', {}).get('cs2', {}).get('game_player_id'))
+        self.record_many([(player_info_data['player_id'], player_info_data.get('nickname'), steam_id_64)])
+
+    def record_rankings(self, items):
+        """ Сохранение никнеймов из страницы рейтинга """
+        self.record_many([(item['player_id'], item.get('nickname'), None) for item in items if item.get('player_id')])
+
+    def record_many(self, rows):
+        now = time.time()
+        self.connection().executemany(
+            """
+            INSERT INTO players (player_id, nickname, nickname_key, steam_id_64, nickname_updated_at, steam_updated_at)
+            VALUES (?1, ?2, lower(?2), ?3, ?4, CASE WHEN ?3 IS NULL THEN NULL ELSE ?4 END)
+            ON CONFLICT (player_id) DO UPDATE SET
+                nickname = COALESCE(excluded.nickname, nickname),
+                nickname_key = COALESCE(excluded.nickname_key, nickname_key),
+                nickname_updated_at = CASE WHEN excluded.nickname IS NULL THEN nickname_updated_at ELSE ?4 END,
+                steam_id_64 = COALESCE(excluded.steam_id_64, steam_id_64),
+                steam_updated_at = CASE WHEN excluded.steam_id_64 IS NULL THEN steam_updated_at ELSE ?4 END
+            """,
+            [(player_id, nickname, steam_id_64, now) for player_id, nickname, steam_id_64 in rows],
+        )
+
+    def record_vanity(self, vanity_url, steam_id_64):
+        self.connection().execute(
+            'INSERT OR REPLACE INTO vanity_urls (vanity_key, steam_id_64, updated_at) VALUES (lower(?), ?, ?)',
+            (vanity_url, steam_id_64, time.time()),
+        )
+
+    def find_by_nickname(self, nickname):
+        """ (player_id, steam_id_64) по никнейму или (None, None) """
+        row = self.connection().execute(
+            'SELECT player_id, steam_id_64 FROM players WHERE nickname_key = lower(?) AND nickname_updated_at > ?'
+            ' ORDER BY nickname_updated_at DESC LIMIT 1',
+            (nickname, time.time() - self.nickname_ttl),
+        ).fetchone()
+        return row if row else (None, None)
+
+    def find_by_steam_id(self, steam_id_64):
+        row = self.connection().execute(
+            'SELECT player_id FROM players WHERE steam_id_64 = ? AND steam_updated_at > ?'
+            ' ORDER BY steam_updated_at DESC LIMIT 1',
+            (steam_id_64, time.time() - self.steam_ttl),
+        ).fetchone()
+        return row[0] if row else None
+
+    def find_vanity(self, vanity_url):
+        row = self.connection().execute(
+            'SELECT steam_id_64 FROM vanity_urls WHERE vanity_key = lower(?) AND updated_at > ?',
+            (vanity_url, time.time() - self.steam_ttl),
+        ).fetchone()
+        return row[0] if row else None
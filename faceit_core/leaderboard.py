@@ -0,0 +1,155 @@
+import base64
+import binascii
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+RankingRow = namedtuple('RankingRow', ['position', 'player_id', 'nickname', 'country', 'faceit_elo', 'rank'])
+
+PAGE_SIZE = 100
+# повтор, пока снимка нет: другой процесс как раз загружает общий снимок
+RETRY_DELAY = 5
+# поля компактного ответа API; строки отдаются массивами в этом порядке
+API_FIELDS = ('position', 'nickname', 'country', 'elo', 'tier')
+
+
+class LeaderboardSnapshot:
+    """ Неизменяемый снимок топа всех регионов, индексированный по позиции """
+
+    __slots__ = ('regions', 'complete', 'created_at')
+
+    def __init__(self, regions, complete, created_at=None):
+        self.regions = regions
+        self.complete = complete
+        self.created_at = created_at if created_at is not None else time.time()
+
+    def age(self):
+        return time.time() - self.created_at
+
+    def get_slice(self, region, offset, limit):
+        """ Срез рейтинга или None, если снимок не покрывает запрошенный диапазон """
+        rows = self.regions.get(region)
+        if rows is None:
+            return None
+        if offset + limit > len(rows) and region not in self.complete:
+            return None
+        return [row._asdict() for row in rows[offset:offset + limit]]
+
+
+class LeaderboardRefresher:
+    """ Фоновый поток, периодически загружающий топ регионов и атомарно подменяющий снимок """
+
+    def __init__(self, fetch_page, regions, depth=1000, interval=300, max_age=None, workers=4, shared=None):
+        self.fetch_page = fetch_page
+        self.shared = shared
+        self.regions = regions
+        self.depth = depth
+        self.interval = interval
+        self.max_age = max_age if max_age is not None else interval * 3
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='leaderboard')
+        self.snapshot = LeaderboardSnapshot({}, frozenset(), created_at=0)
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def ensure_started(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='leaderboard-refresher', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            self.refresh()
+            snapshot = self.snapshot
+            # следующее обновление — когда текущий (возможно, чужой общий) снимок устареет
+            time.sleep(max(RETRY_DELAY, self.interval - snapshot.age()) if snapshot.created_at else RETRY_DELAY)
+
+    def refresh(self):
+        """ Загрузка всех страниц всех регионов; упавший регион остаётся из прошлого снимка """
+        if self.shared is not None:
+            # снимок, уже загруженный другим процессом за этот интервал, берётся без обращения к API
+            snapshot = self.shared.get('leaderboard', 'snapshot')
+            if snapshot is not None and snapshot.age() < self.interval:
+                self.snapshot = snapshot
+                return
+            # загружает один процесс на интервал, остальные до его снимка отдают прошлый общий
+            if not self.shared.acquire('leaderboard', 'refresh', self.interval):
+                if snapshot is not None:
+                    self.snapshot = snapshot
+                return
+
+        futures = {
+            (region, offset): self.executor.submit(self.fetch_page, region, PAGE_SIZE, offset)
+            for region in self.regions
+            for offset in range(0, self.depth, PAGE_SIZE)
+        }
+        previous = self.snapshot
+        regions = {}
+        complete = set()
+
+        for region in self.regions:
+            rows = []
+            try:
+                for offset in range(0, self.depth, PAGE_SIZE):
+                    rows.extend(to_row(item) for item in futures[(region, offset)].result())
+            except Exception as e:
+                logger.warning(f"Leaderboard refresh failed for region {region}: {e}")
+                if region in previous.regions:
+                    regions[region] = previous.regions[region]
+                    if region in previous.complete:
+                        complete.add(region)
+                continue
+            regions[region] = tuple(rows)
+            if len(rows) < self.depth:
+                complete.add(region)
+
+        self.snapshot = LeaderboardSnapshot(regions, frozenset(complete))
+        if self.shared is not None:
+            self.shared.set('leaderboard', 'snapshot', self.snapshot, self.max_age)
+
+    def get_slice(self, region, offset, limit):
+        self.ensure_started()
+        snapshot = self.snapshot
+        if snapshot.age() > self.max_age:
+            return None
+        return snapshot.get_slice(region, offset, limit)
+
+    def age(self):
+        """ Возраст текущего снимка в секундах (None, если снимка ещё нет) """
+        snapshot = self.snapshot
+        return snapshot.age() if snapshot.created_at else None
+
+
+def to_row(item):
+    return RankingRow(
+        position=item.get('position'),
+        player_id=item.get('player_id'),
+        nickname=item.get('nickname'),
+        country=item.get('country'),
+        faceit_elo=item.get('faceit_elo'),
+        rank=item.get('rank'),
+    )
+
+
+def project_row(row):
+    return [row.get('position'), row.get('nickname'), row.get('country'), row.get('faceit_elo'), row.get('rank')]
+
+
+def encode_cursor(offset):
+    """ Непрозрачный курсор следующей страницы """
+    return base64.urlsafe_b64encode(f'o{offset}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """ Смещение из курсора; ValueError для испорченного или чужого курсора """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError(f'invalid cursor: {cursor!r}')
+    if not raw.startswith('o') or not raw[1:].isdigit():
+        raise ValueError(f'invalid cursor: {cursor!r}')
+    return int(raw[1:])
@@ -0,0 +1,239 @@
+""" Разбор лобби: все игроки матча FACEIT или списка никнеймов / ссылок Steam загружаются
+одновременно и сводятся в сравнение команд.
+
+Все запросы лобби делят бюджет времени входящего запроса и общий лимит частоты FACEIT;
+одинаковые значения в списке и одновременные разборы одного лобби объединяются.
+"""
+import logging
+import re
+
+import requests
+
+from faceit_core import deadline
+from faceit_core import metrics
+from faceit_core.players import (fetch_executor, section_executor, match_store, get_match, get_player_info_by_id,
+                                 get_lifetime_stats, resolve_player_info, normalize_lookup, optional_result)
+from faceit_core.settings import settings
+from faceit_core.singleflight import SingleFlight
+from faceit_core.stats import calculate_cs2_statistics
+from faceit_core.stats_engine import MatchStats
+
+# id матча ("1-" + uuid), в том числе внутри ссылки на комнату
+MATCH_ID_RE = re.compile(r'(?:^|/room/)(1-[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})(?:/|$)', re.I)
+TOKEN_SEPARATOR_RE = re.compile(r'[\s,;]+')
+TEAM_SIZE = 5
+logger = logging.getLogger(__name__)
+lobby_flight = SingleFlight()
+metrics.register_flight('lobby', lobby_flight.stats)
+
+
+class LobbyError(ValueError):
+    """ Ввод, по которому нельзя собрать лобби """
+
+
+def parse_match_id(text):
+    """ id матча из id или ссылки на комнату FACEIT; None, если это не они """
+    text = (text or '').strip()
+    match = MATCH_ID_RE.search(text) if len(text.split()) == 1 else None
+    return match.group(1).lower() if match else None
+
+
+def parse_lobby(text):
+    """ ('match', match_id) для id или ссылки на комнату FACEIT, иначе ('players', [[значения команды], ...]).
+
+    Команды в списке разделяются пустой строкой или словом "vs"; список из 10 игроков без
+    разделителя делится пополам.
+    """
+    text = (text or '').strip()
+    if not text:
+        raise LobbyError("Enter a FACEIT match id or a list of nicknames / Steam links")
+    match_id = parse_match_id(text)
+    if match_id:
+        return 'match', match_id
+
+    groups = [[]]
+    seen = set()
+    for line in text.splitlines():
+        if not line.strip() and groups[-1]:
+            groups.append([])
+        for token in TOKEN_SEPARATOR_RE.split(line.strip()):
+            if token.lower() == 'vs':
+                if groups[-1]:
+                    groups.append([])
+            elif token and normalize_lookup(token).lower() not in seen:
+                seen.add(normalize_lookup(token).lower())
+                groups[-1].append(token)
+    groups = [group for group in groups if group]
+
+    if len(seen) > settings['LOBBY_MAX_PLAYERS']:
+        raise LobbyError(f"Too many players: at most {settings['LOBBY_MAX_PLAYERS']} per lobby")
+    if len(groups) == 1 and len(groups[0]) == 2 * TEAM_SIZE:
+        groups = [groups[0][:TEAM_SIZE], groups[0][TEAM_SIZE:]]
+    return 'players', groups
+
+
+def lobby_key(kind, value):
+    if kind == 'match':
+        return kind, value
+    return kind, tuple(tuple(normalize_lookup(token).lower() for token in group) for group in value)
+
+
+def match_teams(match_data):
+    """ [(название, [(player_id, nickname)])] по составам faction1 и faction2 """
+    teams = []
+    for faction in ('faction1', 'faction2'):
+        team = match_data.get('teams', {}).get(faction) or {}
+        members = [(member['player_id'], member.get('nickname')) for member in team.get('roster', [])]
+        teams.append((team.get('name') or faction, members))
+    return teams
+
+
+def resolve_teams(groups):
+    """ Профили игроков списка, запрошенные одновременно: ([(название, [(player_id, nickname)])], профили, не найденные) """
+    futures = {value: fetch_executor.submit(resolve_player_info, value) for group in groups for value in group}
+    infos = {}
+    unresolved = []
+    for value, future in futures.items():
+        try:
+            info = deadline.wait(future)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Error resolving lobby player {value}: {e}")
+            info = None
+        if info and 'player_id' in info:
+            infos[value] = info
+        else:
+            unresolved.append(value)
+
+    # разные значения (никнейм и ссылка Steam) могут указывать на одного игрока
+    teams = []
+    listed = set()
+    for index, group in enumerate(groups, start=1):
+        members = []
+        for value in group:
+            if value in infos and infos[value]['player_id'] not in listed:
+                listed.add(infos[value]['player_id'])
+                members.append((infos[value]['player_id'], infos[value]['nickname']))
+        teams.append((f'Team {index}', members))
+    return teams, {info['player_id']: info for info in infos.values()}, unresolved
+
+
+def start_player_sections(player_id, info, limit):
+    """ Профиль (если его ещё нет), общая статистика и последние limit матчей игрока """
+    return {
+        'info': None if info else fetch_executor.submit(get_player_info_by_id, player_id),
+        'lifetime': fetch_executor.submit(get_lifetime_stats, player_id),
+        # история матчей раскладывает страницы по fetch_executor, поэтому запускается в отдельном пуле
+        'history': section_executor.submit(match_store.get, player_id, limit),
+    }
+
+
+def section_result(future, name):
+    """ optional_result, но и ошибка API по одному игроку не роняет всё лобби """
+    try:
+        return optional_result(future, name)
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Error fetching {name}: {e}")
+        return None
+
+
+def map_rows(breakdown):
+    """ Карты по убыванию числа матчей: [{'map', 'matches', 'avg_kd_ratio', ...}] """
+    rows = [dict(averages, map=map_name) for map_name, averages in breakdown.items() if map_name]
+    return sorted(rows, key=lambda row: -row['matches'])
+
+
+def build_player(player_id, nickname, info, lifetime, history, limit):
+    games = (info or {}).get('games', {}).get('cs2', {})
+    # средние и разбивка по картам — из одного прохода по последним limit матчам
+    match_stats = MatchStats((history or {}).get('items', [])[:limit])
+    matches = match_stats.count
+    return {
+        'player_id': player_id,
+        'nickname': (info or {}).get('nickname') or nickname,
+        'country': (info or {}).get('country'),
+        'avatar': (info or {}).get('avatar'),
+        'elo': games.get('faceit_elo'),
+        'level': games.get('skill_level'),
+        'lifetime': calculate_cs2_statistics(lifetime) if lifetime and 'segments' in lifetime else None,
+        'recent': match_stats.averages(matches) if matches else None,
+        'recent_matches': matches,
+        'recent_maps': map_rows(match_stats.map_breakdown()),
+    }
+
+
+def mean(values):
+    values = [value for value in values if value is not None]
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def team_maps(players):
+    """ Карты команды за последние матчи игроков: сумма матчей и K/D, взвешенный по матчам """
+    totals = {}
+    for player in players:
+        for row in player['recent_maps']:
+            matches, kd_sum = totals.get(row['map'], (0, 0.0))
+            totals[row['map']] = (matches + row['matches'], kd_sum + row['avg_kd_ratio'] * row['matches'])
+    rows = [{'map': map_name, 'matches': matches, 'avg_kd_ratio': round(kd_sum / matches, 2)}
+            for map_name, (matches, kd_sum) in totals.items()]
+    return sorted(rows, key=lambda row: -row['matches'])
+
+
+def team_summary(players):
+    """ Средние команды по игрокам, для которых есть данные """
+    lifetime = [player['lifetime'] or {} for player in players]
+    recent = [player['recent'] or {} for player in players]
+    return {
+        'players': len(players),
+        'avg_elo': mean(player['elo'] for player in players),
+        'avg_kd_ratio': mean(stats.get('Average K/D Ratio') for stats in lifetime),
+        'avg_win_rate': mean(stats.get('Win Rate %') for stats in lifetime),
+        'avg_headshots': mean(stats.get('Average Headshots %') for stats in lifetime),
+        'recent_kd_ratio': mean(stats.get('avg_kd_ratio') for stats in recent),
+        'recent_kr_ratio': mean(stats.get('avg_kr_ratio') for stats in recent),
+        'recent_kills': mean(stats.get('avg_kills') for stats in recent),
+        'recent_hs_procent': mean(stats.get('avg_hs_procent') for stats in recent),
+        'recent_maps': team_maps(players),
+    }
+
+
+def load_lobby(kind, value, limit=None):
+    """ Сравнение команд лобби; ответ собирается за одно обращение на каждый раздел каждого игрока.
+
+    Общая статистика и история необязательны: не успевшие к дедлайну приходят как None.
+    """
+    limit = limit or settings['LOBBY_HISTORY_DEPTH']
+    if kind == 'match':
+        teams, infos, unresolved = match_teams(get_match(value)), {}, []
+    else:
+        teams, infos, unresolved = resolve_teams(value)
+
+    sections = {}
+    for _, members in teams:
+        for player_id, _ in members:
+            if player_id not in sections:
+                sections[player_id] = start_player_sections(player_id, infos.get(player_id), limit)
+
+    players = {}
+    for player_id, player_sections in sections.items():
+        info = infos.get(player_id)
+        if player_sections['info'] is not None:
+            info = section_result(player_sections['info'], 'lobby profile')
+        players[player_id] = (info, section_result(player_sections['lifetime'], 'lobby lifetime stats'),
+                              section_result(player_sections['history'], 'lobby match history'))
+
+    result_teams = []
+    for name, members in teams:
+        rows = [build_player(player_id, nickname, *players[player_id], limit) for player_id, nickname in members]
+        result_teams.append({'name': name, 'players': rows, 'summary': team_summary(rows)})
+    return {
+        'match_id': value if kind == 'match' else None,
+        'history_depth': limit,
+        'teams': result_teams,
+        'unresolved': unresolved,
+    }
+
+
+def fetch_lobby(text, limit=None):
+    """ load_lobby по вводу пользователя, объединяющий одновременные разборы одного лобби """
+    kind, value = parse_lobby(text)
+    return lobby_flight.do((lobby_key(kind, value), limit), lambda: load_lobby(kind, value, limit))
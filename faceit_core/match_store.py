@@ -0,0 +1,124 @@
+import sys
+import threading
+
+from faceit_core.cache import CountingLRUCache
+
+
+def match_id(item):
+    return item.get('stats', {}).get('Match Id')
+
+
+def item_size(item):
+    """ Примерный размер матча в памяти: словари ответа и значения полей статистики """
+    stats = item.get('stats', {})
+    return sys.getsizeof(item) + sys.getsizeof(stats) + sum(sys.getsizeof(value) for value in stats.values())
+
+
+def entry_size(entry):
+    return entry[2]
+
+
+class MatchHistoryStore:
+    """ Локальная история матчей игроков с инкрементальной дозагрузкой.
+
+    Для известного игрока запрашивается одна маленькая страница свежих матчей, новые матчи
+    добавляются в начало сохранённой истории. Полная загрузка выполняется только для
+    холодного кэша, при разрыве (новых матчей больше, чем в пробной странице) или когда
+    нужна более глубокая история, чем сохранена.
+
+    Ошибки из partial_errors (например, исчерпанный бюджет запроса) не роняют загрузку, если уже
+    есть какие-то матчи: отдаётся сохранённая история или полученные страницы, остальное догрузится
+    в следующий раз.
+
+    Истории хранятся как сырые матчи FACEIT, поэтому кэш ограничен по памяти (max_bytes), а не
+    по числу игроков: записи вытесняются по LRU, история больше лимита не сохраняется вовсе.
+    """
+
+    def __init__(self, fetch_page, executor, max_bytes=32 * 1024 * 1024, probe_size=20, page_size=100, max_items=1000,
+                 partial_errors=()):
+        self.fetch_page = fetch_page
+        self.partial_errors = partial_errors
+        self.executor = executor
+        self.probe_size = probe_size
+        self.page_size = page_size
+        self.max_items = max_items
+        self.entries = CountingLRUCache(maxsize=max_bytes, getsizeof=entry_size)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, player_id, limit):
+        """ Последние limit матчей игрока в формате ответа /games/cs2/stats.
+
+        complete — в items вся история игрока: более глубокий запрос не даст новых матчей.
+        """
+        if limit <= 0:
+            return {'items': []}
+        with self.lock:
+            items, complete, nbytes = self.entries.get(player_id, ((), False, 0))
+
+        if items:
+            try:
+                probe = self.fetch_page(player_id, self.probe_size, 0).get('items') or []
+            except self.partial_errors:
+                return {'items': list(items[:limit]), 'complete': complete and len(items) <= limit}
+            probe_ids = [match_id(item) for item in probe]
+            newest_known = match_id(items[0])
+            if newest_known in probe_ids:
+                newer = tuple(probe[:probe_ids.index(newest_known)])
+                items = newer + items
+                nbytes += sum(item_size(item) for item in newer)
+            else:
+                items, complete, nbytes = (), False, 0
+
+        fetch_older = len(items) < limit and not complete
+        with self.lock:
+            if fetch_older:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if fetch_older:
+            older, complete = self.fetch_range(player_id, len(items), limit)
+            items = items + older
+            nbytes += sum(item_size(item) for item in older)
+
+        if len(items) > self.max_items:
+            nbytes -= sum(item_size(item) for item in items[self.max_items:])
+            items, complete = items[:self.max_items], False
+        with self.lock:
+            try:
+                self.entries[player_id] = (items, complete, nbytes)
+            except ValueError:
+                self.entries.pop(player_id, None)
+        return {'items': list(items[:limit]), 'complete': complete and len(items) <= limit}
+
+    def fetch_range(self, player_id, start, end):
+        """ Параллельная загрузка матчей [start, end); второй элемент — достигнут ли конец истории """
+        pages = [(min(self.page_size, end - offset), offset) for offset in range(start, end, self.page_size)]
+        futures = [self.executor.submit(self.fetch_page, player_id, page_limit, offset) for page_limit, offset in pages]
+        items = []
+        complete = False
+        for index, ((page_limit, _), future) in enumerate(zip(pages, futures)):
+            try:
+                page_items = future.result().get('items') or []
+            except self.partial_errors:
+                if start == 0 and not items:
+                    raise
+                for rest in futures[index + 1:]:
+                    rest.cancel()
+                break
+            items.extend(page_items)
+            if len(page_items) < page_limit:
+                complete = True
+                break
+        return tuple(items), complete
+
+    def stats(self):
+        """ Попадание — история отдана после одной пробной страницы, без загрузки диапазона """
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.entries.evictions,
+                    'size': len(self.entries), 'bytes': self.entries.currsize, 'max_bytes': self.entries.maxsize}
+
+    def invalidate(self, player_id):
+        with self.lock:
+            self.entries.pop(player_id, None)
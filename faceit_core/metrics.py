@@ -0,0 +1,231 @@
+""" Метрики процесса в текстовом формате Prometheus (0.0.4) без внешних зависимостей.
+
+Счётчики и гистограммы обновляются на горячем пути (одна блокировка на наблюдение),
+состояние кэшей читается из их stats() только в момент выгрузки. Каждый процесс
+(воркер gunicorn, бот) отдаёт свои значения — суммирование на стороне Prometheus.
+"""
+import bisect
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+
+
+def format_value(value):
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            values = list(self.values.items())
+        for labels, value in values:
+            yield self.name, format_labels(self.labelnames, labels), value
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [количество по корзинам (последняя — +Inf), сумма]
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        with self.lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self.series.items()]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield self.name + '_bucket', format_labels(self.labelnames, labels, [('le', format_value(bound))]), cumulative
+            yield self.name + '_sum', format_labels(self.labelnames, labels), total
+            yield self.name + '_count', format_labels(self.labelnames, labels), cumulative
+
+
+class CallbackMetric:
+    """ Значения, которые считаются в момент выгрузки: collect() -> [(labels, value)] """
+
+    def __init__(self, name, documentation, type, labelnames, collect):
+        self.name = name
+        self.documentation = documentation
+        self.type = type
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def samples(self):
+        for labels, value in self.collect():
+            yield self.name, format_labels(self.labelnames, labels), value
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(f'{name}{labels} {format_value(value)}' for name, labels, value in metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+upstream_seconds = registry.register(Histogram(
+    'faceit_helper_upstream_request_duration_seconds', 'Duration of one upstream HTTP attempt.', ('api', 'endpoint')))
+upstream_responses = registry.register(Counter(
+    'faceit_helper_upstream_responses_total', 'Upstream HTTP responses by status code.', ('api', 'endpoint', 'status')))
+upstream_errors = registry.register(Counter(
+    'faceit_helper_upstream_errors_total', 'Upstream calls failed without a response (timeout, connection, deadline).',
+    ('api', 'endpoint', 'error')))
+http_seconds = registry.register(Histogram(
+    'faceit_helper_http_request_duration_seconds', 'Time to response headers per route.', ('route', 'method')))
+http_requests = registry.register(Counter(
+    'faceit_helper_http_requests_total', 'HTTP requests per route and status.', ('route', 'method', 'status')))
+bot_update_seconds = registry.register(Histogram(
+    'faceit_helper_bot_update_duration_seconds', 'Bot handler duration per command.', ('command',)))
+bot_updates = registry.register(Counter(
+    'faceit_helper_bot_updates_total', 'Bot updates per command and outcome.', ('command', 'outcome')))
+sections_skipped = registry.register(Counter(
+    'faceit_helper_sections_skipped_total', 'Optional sections dropped because they missed the request deadline.',
+    ('section',)))
+
+caches = {}
+
+
+def register_cache(name, stats):
+    """ Кэш в метриках: stats() возвращает словарь с hits, misses, evictions, size (любые из них) """
+    caches[name] = stats
+
+
+def cache_values(key):
+    def collect():
+        for name, stats in list(caches.items()):
+            value = stats().get(key)
+            if value is not None:
+                yield (name,), value
+    return collect
+
+
+registry.register(CallbackMetric('faceit_helper_cache_hits_total', 'Cache lookups served from the cache.',
+                                 'counter', ('cache',), cache_values('hits')))
+registry.register(CallbackMetric('faceit_helper_cache_misses_total', 'Cache lookups that went to the source.',
+                                 'counter', ('cache',), cache_values('misses')))
+registry.register(CallbackMetric('faceit_helper_cache_evictions_total', 'Entries evicted to stay within the size limit.',
+                                 'counter', ('cache',), cache_values('evictions')))
+registry.register(CallbackMetric('faceit_helper_cache_entries', 'Entries currently in the cache.',
+                                 'gauge', ('cache',), cache_values('size')))
+
+
+flights = {}
+batchers = {}
+
+
+def register_flight(name, stats):
+    """ SingleFlight в метриках: stats() с executions и deduplicated """
+    flights[name] = stats
+
+
+def register_batcher(name, stats):
+    """ Сборщик запросов в пачки в метриках: stats() с requested и batches """
+    batchers[name] = stats
+
+
+def collect_flights():
+    for name, stats in list(flights.items()):
+        values = stats()
+        yield (name, 'executed'), values['executions']
+        yield (name, 'deduplicated'), values['deduplicated']
+
+
+def batcher_values(key):
+    def collect():
+        for name, stats in list(batchers.items()):
+            yield (name,), stats()[key]
+    return collect
+
+
+registry.register(CallbackMetric('faceit_helper_singleflight_calls_total',
+                                 'Calls through a single-flight group: executed or joined an identical call in flight.',
+                                 'counter', ('flight', 'outcome'), collect_flights))
+registry.register(CallbackMetric('faceit_helper_batch_requests_total', 'Lookups submitted to a request batcher.',
+                                 'counter', ('batcher',), batcher_values('requested')))
+registry.register(CallbackMetric('faceit_helper_batch_calls_total', 'Upstream calls made by a request batcher.',
+                                 'counter', ('batcher',), batcher_values('batches')))
+
+
+def start_http_server(port, addr='127.0.0.1'):
+    """ Отдельный HTTP-сервер с /metrics для процессов без Flask (бот) """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((addr, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-exporter', daemon=True).start()
+    return server
@@ -0,0 +1,487 @@
+""" Поиск игроков, профили, рейтинги и история матчей FACEIT/Steam с кэшами и объединением запросов """
+import logging
+import re
+import threading
+from urllib.parse import urlparse
+
+import requests
+from cachetools import TTLCache
+
+from faceit_core import deadline
+from faceit_core import metrics
+from faceit_core.cache import StaleWhileRevalidateCache
+from faceit_core.client import faceit_client, steam_client
+from faceit_core.identity import IdentityIndex
+from faceit_core.leaderboard import LeaderboardRefresher
+from faceit_core.match_store import MatchHistoryStore
+from faceit_core.settings import settings
+from faceit_core.shared_cache import create_backend
+from faceit_core.singleflight import SingleFlight
+from faceit_core.steam_batch import SteamSummaryBatcher
+
+logger = logging.getLogger(__name__)
+
+shared_cache = create_backend(settings['CACHE_BACKEND_URL'])
+ranking_cache = StaleWhileRevalidateCache(maxsize=settings['RANKING_CACHE_SIZE'], ttl=settings['RANKING_CACHE_TTL'],
+                                          stale_ttl=settings['RANKING_CACHE_STALE_TTL'],
+                                          shared=shared_cache, namespace='ranking')
+fetch_executor = deadline.ContextExecutor(max_workers=settings['FETCH_WORKERS'], thread_name_prefix='faceit-fetch')
+# история матчей сама раскладывает страницы по fetch_executor, поэтому запускается в отдельном пуле
+section_executor = deadline.ContextExecutor(max_workers=settings['FETCH_WORKERS'], thread_name_prefix='faceit-section')
+profile_flight = SingleFlight()
+not_found_cache = TTLCache(maxsize=settings['NOT_FOUND_CACHE_SIZE'], ttl=settings['NOT_FOUND_CACHE_TTL'])
+not_found_lock = threading.Lock()
+identity_index = IdentityIndex(
+    settings['IDENTITY_DB_PATH'],
+    nickname_ttl=settings['IDENTITY_NICKNAME_TTL'],
+    steam_ttl=settings['IDENTITY_STEAM_TTL'],
+) if settings['IDENTITY_INDEX_ENABLED'] else None
+
+class Player:
+    def __init__(self, player_id, nickname, avatar, country, games, faceit_url, position, faceit_elo):
+        self.player_id = player_id
+        self.nickname = nickname
+        self.avatar = avatar
+        self.position = position
+        self.country = country
+        self.games = games
+        self.faceit_elo = faceit_elo
+        self.faceit_url = faceit_url
+
+    @staticmethod
+    def from_dict(data):
+        games = {key: value for key, value in data.get('games', {}).items() if key in ['csgo', 'cs2']}
+        return Player(
+            player_id=data.get('player_id'),
+            nickname=data.get('nickname'),
+            country=data.get('country'),
+        )
+
+    @staticmethod
+    def fetch_global_ranking(region, limit=40, offset=0):
+        """ Загрузка страницы рейтинга региона без кэша (ошибки пробрасываются) """
+        response = faceit_client().get(f'rankings/games/cs2/regions/{region}', params={'limit': limit, 'offset': offset})
+        response.raise_for_status()
+        data = response.json().get('items', [])
+
+        for player in data:
+            position = player['position']
+            if position == 1:
+                player['rank'] = '1'
+            elif position == 2:
+                player['rank'] = '2'
+            elif position == 3:
+                player['rank'] = '3'
+            elif 4 <= position <= 9:
+                player['rank'] = '4-9'
+            elif 10 <= position <= 1000:
+                player['rank'] = '9-1000'
+
+        if identity_index is not None:
+            identity_index.record_rankings(data)
+        return data
+
+    @staticmethod
+    def get_global_ranking(region, limit=40, offset=0):
+        if leaderboard is not None:
+            rankings = leaderboard.get_slice(region, offset, limit)
+            if rankings is not None:
+                return rankings
+        try:
+            return ranking_cache.get((region, limit, offset), lambda: Player.fetch_global_ranking(region, limit, offset))
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to fetch global ranking for region {region}: {str(e)}")
+            return []
+
+    @staticmethod
+    def get_global_eu_ranking(limit=100, offset=0):
+        return Player.get_global_ranking('EU', limit, offset)
+
+    @staticmethod
+    def get_global_na_ranking(limit=100, offset=0):
+        return Player.get_global_ranking('NA', limit, offset)
+
+    @staticmethod
+    def get_global_sa_ranking(limit=100, offset=0):
+        return Player.get_global_ranking('SA', limit, offset)
+
+    @staticmethod
+    def get_global_sea_ranking(limit=100, offset=0):
+        return Player.get_global_ranking('SEA', limit, offset)
+
+    @staticmethod
+    def get_global_oce_ranking(limit=100, offset=0):
+        return Player.get_global_ranking('OCE', limit, offset)
+
+leaderboard = LeaderboardRefresher(
+    Player.fetch_global_ranking,
+    regions=settings['LEADERBOARD_REGIONS'],
+    depth=settings['LEADERBOARD_DEPTH'],
+    interval=settings['LEADERBOARD_REFRESH_INTERVAL'],
+    shared=shared_cache,
+) if settings['LEADERBOARD_REFRESH_ENABLED'] else None
+
+
+def get_steam_vanity_url(url):
+    """ Получение части URL SteamID из профиля Steam """
+    parsed_url = urlparse(url)
+    path_parts = parsed_url.path.rstrip('/').split('/')
+    return path_parts[-1]
+
+
+def get_steam_profiles_url(url):
+    """ Получение части URL SteamID из ванильного профиля Steam """
+    parsed_url = urlparse(url)
+    path_parts = parsed_url.path.rstrip('/').split('/')
+    return path_parts[-1]
+
+
+def search_faceit_nickname(nickname):
+    """ Поиск SteamID64 по никнейму на Faceit (ошибки API пробрасываются) """
+    response = faceit_client().get('players', params={'nickname': nickname})
+    response.raise_for_status()
+    data = response.json()
+    if identity_index is not None:
+        identity_index.record_player(data)
+    return data.get('steam_id_64') or None
+
+
+def get_steamid64_from_vanity_url(vanity_url):
+    """ Поиск SteamID64 по ванильному URL Steam: None — Steam ответил, что такого URL нет; ошибки API пробрасываются """
+    params = {'key': settings['STEAM_API_KEY'], 'vanityurl': vanity_url}
+    response = steam_client().get('ISteamUser/ResolveVanityURL/v0001/', params=params)
+    response.raise_for_status()
+    data = response.json()
+    if data['response']['success'] == 1:
+        if identity_index is not None:
+            identity_index.record_vanity(vanity_url, data['response']['steamid'])
+        return data['response']['steamid']
+    return None
+
+
+def get_player_summaries(steamids):
+    """ Профили Steam для нескольких SteamID64 одним запросом (не более 100) """
+    params = {'key': settings['STEAM_API_KEY'], 'steamids': ','.join(steamids)}
+    response = steam_client().get('ISteamUser/GetPlayerSummaries/v0002/', params=params)
+    response.raise_for_status()
+    players = response.json().get('response', {}).get('players', [])
+    return {player['steamid']: player for player in players}
+
+
+steam_batcher = SteamSummaryBatcher(get_player_summaries, window=settings['STEAM_BATCH_WINDOW'])
+vanity_flight = SingleFlight()
+
+
+def search_steamid(steamid):
+    """ Поиск информации по SteamID64: None — у Steam нет такого профиля; ошибки API пробрасываются """
+    player = deadline.wait(steam_batcher.submit(steamid))
+    return player['steamid'] if player else None
+
+
+def resolve_vanity_url(vanity_url):
+    """ SteamID64 по vanity URL: из индекса или одним (общим для одновременных вызовов) запросом """
+    if identity_index is not None:
+        steamid_64 = identity_index.find_vanity(vanity_url)
+        if steamid_64:
+            return steamid_64
+    return vanity_flight.do(vanity_url.lower(), lambda: get_steamid64_from_vanity_url(vanity_url))
+
+
+def search_player(search_value):
+    """ Функция для поиска игрока по заданному значению """
+    result = search_by_value(search_value)
+    return result
+
+
+def search_value(form_search_value):
+    search_value = form_search_value
+    steamid_64 = search_player(search_value)
+
+
+def determine_input_type(search_value):
+    """ Определение типа ввода (SteamID64, URL Steam или никнейм Faceit) """
+    if re.match(r'^\d{17}$', search_value):
+        return 'steamid64'
+    elif re.match(r'^https?://steamcommunity\.com/id/[a-zA-Z0-9_-]+/?$', search_value):
+        return 'steam_url'
+    elif re.match(r'^https?://steamcommunity\.com/profiles/[a-zA-Z0-9_-]+/?$', search_value):
+        return 'ez_steamid64'
+    else:
+        return 'faceit_nickname'
+
+
+FACEIT_NICKNAME_RE = re.compile(r'^[A-Za-z0-9_-]{3,12}$')
+STEAMID64_RE = re.compile(r'^\d{17}$')
+
+
+def is_valid_lookup(search_value):
+    """ Может ли ввод вообще быть игроком: никнейм FACEIT — 3–12 символов из латиницы, цифр, '-' и '_' """
+    if not search_value:
+        return False
+    if determine_input_type(search_value) != 'faceit_nickname':
+        return True
+    return FACEIT_NICKNAME_RE.match(search_value) is not None
+
+
+def is_known_not_found(search_value):
+    key = normalize_lookup(search_value)
+    with not_found_lock:
+        if key in not_found_cache:
+            return True
+    return shared_cache is not None and shared_cache.get('not_found', key) is not None
+
+
+def remember_not_found(search_value):
+    key = normalize_lookup(search_value)
+    with not_found_lock:
+        not_found_cache[key] = True
+    if shared_cache is not None:
+        shared_cache.set('not_found', key, True, settings['NOT_FOUND_CACHE_TTL'])
+
+
+def normalize_lookup(search_value):
+    """ Нормализация ввода для ключей кэшей и объединения запросов """
+    search_value = search_value.strip()
+    if determine_input_type(search_value) in ('steam_url', 'ez_steamid64'):
+        return search_value.lower().rstrip('/')
+    return search_value
+
+
+def search_by_value(search_value):
+    """ Поиск по заданному значению (SteamID64, URL Steam или никнейм Faceit) """
+    input_type = determine_input_type(search_value)
+    if input_type == 'ez_steamid64':
+        return get_steam_profiles_url(search_value)
+    if input_type == 'steamid64':
+        return search_steamid(search_value)
+    elif input_type == 'steam_url':
+        vanity_url = get_steam_vanity_url(search_value)
+        steamid64 = resolve_vanity_url(vanity_url)
+        if steamid64:
+            return search_steamid(steamid64)
+    elif input_type == 'faceit_nickname':
+        return search_faceit_nickname(search_value)
+
+
+def get_player_info(steamid_64):
+    """ Профиль игрока FACEIT по SteamID64 """
+    response = faceit_client().get('players', params={'game': 'cs2', 'game_player_id': steamid_64})
+    response.raise_for_status()
+    return response.json()
+
+
+def get_player_info_by_id(player_id):
+    """ Профиль игрока FACEIT по player_id """
+    response = faceit_client().get(f'players/{player_id}')
+    response.raise_for_status()
+    return response.json()
+
+
+def get_player_info_by_nickname(nickname):
+    """ Профиль игрока FACEIT по никнейму """
+    response = faceit_client().get('players', params={'nickname': nickname})
+    response.raise_for_status()
+    return response.json()
+
+
+def lookup_identity(search_value):
+    """ (player_id, steam_id_64) из индекса идентичностей; неизвестные значения — None """
+    if identity_index is None:
+        return None, None
+    input_type = determine_input_type(search_value)
+    if input_type == 'faceit_nickname':
+        return identity_index.find_by_nickname(search_value)
+    if input_type == 'steam_url':
+        steamid_64 = identity_index.find_vanity(get_steam_vanity_url(search_value))
+    elif input_type == 'ez_steamid64':
+        steamid_64 = get_steam_profiles_url(search_value)
+    else:
+        steamid_64 = search_value
+    player_id = identity_index.find_by_steam_id(steamid_64) if steamid_64 else None
+    if input_type == 'steamid64' and not player_id:
+        return None, None
+    return player_id, steamid_64
+
+
+def resolve_player_info(search_value):
+    """ Профиль игрока FACEIT по любому вводу: известные связи берутся из индекса без лишних запросов.
+
+    Невалидный ввод и недавние промахи отбрасываются без обращения к API ({}).
+    """
+    if not is_valid_lookup(search_value) or is_known_not_found(search_value):
+        return {}
+
+    player_id, steamid_64 = lookup_identity(search_value)
+    if not player_id and (steamid_64 or determine_input_type(search_value) != 'faceit_nickname'):
+        # ошибки Steam пробрасываются и в кэш промахов не попадают; None — Steam ответил, что профиля нет
+        steamid_64 = steamid_64 or search_player(search_value)
+        if steamid_64 is None:
+            remember_not_found(search_value)
+            return {}
+        if not STEAMID64_RE.match(steamid_64):
+            return {}
+
+    try:
+        if player_id:
+            player_info_data = get_player_info_by_id(player_id)
+        elif steamid_64:
+            player_info_data = get_player_info(steamid_64)
+        else:
+            player_info_data = get_player_info_by_nickname(search_value)
+        if 'cs2' not in player_info_data.get('games', {}):
+            player_info_data = {}
+    except requests.exceptions.HTTPError as e:
+        # в кэш промахов попадает только ответ FACEIT «не найден», временные ошибки — никогда
+        if e.response is not None and e.response.status_code == 404:
+            remember_not_found(search_value)
+        raise
+
+    if 'player_id' not in player_info_data:
+        remember_not_found(search_value)
+    elif identity_index is not None:
+        identity_index.record_player(player_info_data)
+    return player_info_data
+
+
+def get_player_rank(region, player_id, country=None):
+    """ Позиция игрока в рейтинге региона (или страны) """
+    params = {'country': country} if country else None
+    response = faceit_client().get(f'rankings/games/cs2/regions/{region}/players/{player_id}', params=params)
+    response.raise_for_status()
+    data = response.json()
+    return next((item['position'] for item in data['items'] if item['player_id'] == player_id), None)
+
+
+def get_match_history_page(player_id, limit=100, offset=0):
+    """ Одна страница истории матчей CS2 """
+    params = {'limit': limit}
+    if offset:
+        params['offset'] = offset
+    response = faceit_client().get(f'players/{player_id}/games/cs2/stats', params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+def get_match(match_id):
+    """ Матч FACEIT: команды (teams.faction1/faction2) с составами """
+    response = faceit_client().get(f'matches/{match_id}')
+    response.raise_for_status()
+    return response.json()
+
+
+def get_lifetime_stats(player_id):
+    """ Общая статистика игрока CS2 """
+    response = faceit_client().get(f'players/{player_id}/stats/cs2')
+    response.raise_for_status()
+    return response.json()
+
+
+match_store = MatchHistoryStore(get_match_history_page, fetch_executor, max_bytes=settings['MATCH_STORE_MAX_BYTES'],
+                                probe_size=settings['MATCH_STORE_PROBE_SIZE'],
+                                max_items=settings['MATCH_HISTORY_MAX_DEPTH'],
+                                partial_errors=(requests.exceptions.Timeout,))
+metrics.register_cache('ranking', ranking_cache.stats)
+metrics.register_cache('match_history', match_store.stats)
+metrics.register_flight('profile', profile_flight.stats)
+metrics.register_flight('vanity', vanity_flight.stats)
+metrics.register_batcher('steam_summaries', steam_batcher.stats)
+
+
+def optional_result(future, name):
+    """ Результат необязательной части ответа или None, если она не уложилась в бюджет запроса """
+    try:
+        return deadline.wait(future)
+    except requests.exceptions.Timeout as e:
+        logger.warning(f"Skipping {name}: {e}")
+        metrics.sections_skipped.inc(name)
+        return None
+
+
+def search_by_steamid_64(search_value):
+    try:
+        player_info_data = resolve_player_info(search_value)
+
+        if 'player_id' in player_info_data and 'nickname' in player_info_data:
+            player_id = player_info_data['player_id']
+            country = player_info_data['country']
+            region = player_info_data['games']['cs2']['region']
+
+            player_global_rank = fetch_executor.submit(get_player_rank, region, player_id)
+            player_country_rank = fetch_executor.submit(get_player_rank, region, player_id, country)
+
+            return (player_info_data, player_id, player_info_data['nickname'],
+                    optional_result(player_global_rank, 'global rank'), optional_result(player_country_rank, 'country rank'))
+        else:
+            return None, None, None, None, None
+
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Error fetching player info: {e}")
+        return None, None, None, None, None
+
+
+def get_player_stats(player_id, limit=100):
+    try:
+        full_player_stats = fetch_executor.submit(get_lifetime_stats, player_id)
+        player_stats_data = match_store.get(player_id, limit)
+
+        return player_stats_data, optional_result(full_player_stats, 'lifetime stats')
+    
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Error fetching player stats: {e}")
+        return None, None
+
+
+def start_profile_sections(player_info_data, limit=200):
+    """ Запуск загрузки рангов, общей статистики и истории матчей; результаты приходят по мере готовности """
+    player_id = player_info_data['player_id']
+    region = player_info_data['games']['cs2']['region']
+    return {
+        'global_rank': fetch_executor.submit(get_player_rank, region, player_id),
+        'country_rank': fetch_executor.submit(get_player_rank, region, player_id, player_info_data['country']),
+        'lifetime': fetch_executor.submit(get_lifetime_stats, player_id),
+        'history': section_executor.submit(match_store.get, player_id, limit),
+    }
+
+
+def load_player_profile(search_value, limit=200):
+    """ Профиль, ранги и статистика игрока: все независимые запросы выполняются параллельно.
+
+    Ранги и общая статистика необязательны: не успевшие к дедлайну запроса приходят как None.
+    Ненайденный игрок — кортеж из None; остальные ошибки API (5xx, таймауты) пробрасываются.
+    """
+    try:
+        player_info_data = resolve_player_info(search_value)
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return None, None, None, None, None
+        raise
+    if 'player_id' not in player_info_data or 'nickname' not in player_info_data:
+        return None, None, None, None, None
+
+    sections = start_profile_sections(player_info_data, limit)
+    player_stats_data = deadline.wait(sections['history'])
+    return (player_info_data, player_stats_data, optional_result(sections['lifetime'], 'lifetime stats'),
+            optional_result(sections['global_rank'], 'global rank'),
+            optional_result(sections['country_rank'], 'country rank'))
+
+
+def load_profile_sections(search_value, limit=200):
+    """ Профиль игрока и запущенные загрузки его разделов (start_profile_sections); (None, None) — игрок не найден """
+    player_info_data = resolve_player_info(search_value)
+    if 'player_id' not in player_info_data or 'nickname' not in player_info_data:
+        return None, None
+    return player_info_data, start_profile_sections(player_info_data, limit)
+
+
+def fetch_profile_sections(search_value, limit=200):
+    """ load_profile_sections, объединяющий одновременные одинаковые запросы: разделы ждут общие futures """
+    search_value = search_value.strip()
+    key = ('profile_sections', normalize_lookup(search_value), limit)
+    return profile_flight.do(key, lambda: load_profile_sections(search_value, limit))
+
+
+def fetch_player_profile(search_value, limit=200):
+    """ load_player_profile, объединяющий одновременные одинаковые запросы """
+    search_value = search_value.strip()
+    key = ('profile', normalize_lookup(search_value), limit)
+    return profile_flight.do(key, lambda: load_player_profile(search_value, limit))
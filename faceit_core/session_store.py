@@ -0,0 +1,44 @@
+import threading
+
+from faceit_core.cache import CountingTTLCache
+
+
+def match_stats_size(match_stats):
+    return match_stats.nbytes
+
+
+class PlayerSessionStore:
+    """ Общее для всех пользователей бота хранилище компактной статистики игроков.
+
+    Хранит MatchStats по player_id; пользователь держит у себя только player_id.
+    Записи вытесняются по LRU при превышении лимита памяти и по TTL.
+    """
+
+    def __init__(self, max_bytes, ttl):
+        self.entries = CountingTTLCache(maxsize=max_bytes, ttl=ttl, getsizeof=match_stats_size)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def put(self, player_id, match_stats):
+        if match_stats is None:
+            return
+        with self.lock:
+            try:
+                self.entries[player_id] = match_stats
+            except ValueError:
+                pass
+
+    def get(self, player_id):
+        with self.lock:
+            match_stats = self.entries.get(player_id)
+            if match_stats is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return match_stats
+
+    def stats(self):
+        with self.lock:
+            return {'size': len(self.entries), 'bytes': self.entries.currsize, 'max_bytes': self.entries.maxsize,
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.entries.evictions}
@@ -0,0 +1,29 @@
+""" Настройки ядра: значения config.Config (из окружения) без Flask.
+
+Веб-приложение читает тот же config.Config в app.config. Пакетные задачи могут
+переопределить значения через configure() до первого обращения к модулям ядра:
+большинство из них читает настройки при импорте.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+
+class Settings:
+    def __init__(self, source):
+        self.values = {key: getattr(source, key) for key in dir(source) if key.isupper()}
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def configure(self, **overrides):
+        self.values.update(overrides)
+
+
+settings = Settings(Config)
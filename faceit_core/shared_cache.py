@@ -0,0 +1,56 @@
+import logging
+import pickle
+
+logger = logging.getLogger(__name__)
+
+
+class RedisBackend:
+    """ Общий для всех процессов кэш поверх Redis.
+
+    Используется как второй уровень за локальными кэшами: промах или ошибка Redis
+    означают просто обращение к источнику, а не ошибку запроса.
+    """
+
+    def __init__(self, url, prefix='faceit-helper'):
+        # redis импортируется только при заданном CACHE_BACKEND_URL: сам пакет тяжёлый
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND_URL задан, но пакет redis не установлен (pip install redis)") from None
+        self.errors = redis.RedisError
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.prefix = prefix
+
+    def make_key(self, namespace, key):
+        return f'{self.prefix}:{namespace}:{key!r}'
+
+    def get(self, namespace, key):
+        try:
+            raw = self.client.get(self.make_key(namespace, key))
+        except self.errors as e:
+            logger.warning(f"Shared cache read failed for {namespace}: {e}")
+            return None
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, namespace, key, value, ttl):
+        try:
+            self.client.set(self.make_key(namespace, key), pickle.dumps(value), ex=max(1, int(ttl)))
+        except self.errors as e:
+            logger.warning(f"Shared cache write failed for {namespace}: {e}")
+
+    def acquire(self, namespace, key, ttl):
+        """ Блокировка на ttl секунд (SET NX): True, если её взял этот процесс или Redis недоступен """
+        try:
+            return bool(self.client.set(self.make_key(namespace, key), b'1', nx=True, ex=max(1, int(ttl))))
+        except self.errors as e:
+            logger.warning(f"Shared cache lock failed for {namespace}: {e}")
+            return True
+
+
+def create_backend(url):
+    """ Общий бэкенд по CACHE_BACKEND_URL или None — тогда кэши остаются локальными для процесса """
+    if not url:
+        return None
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported CACHE_BACKEND_URL: {url}")
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """ Объединение одновременных одинаковых запросов в один.
+
+    Первый вызов с ключом выполняет функцию, остальные, пришедшие до её завершения,
+    ждут тот же результат (или то же исключение). Работает и из потоков, и из asyncio.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.calls = 0
+        self.executions = 0
+        self.deduplicated = 0
+
+    def begin(self, key):
+        with self.lock:
+            self.calls += 1
+            future = self.in_flight.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                return future, False
+            future = Future()
+            self.in_flight[key] = future
+            self.executions += 1
+            return future, True
+
+    def run(self, key, future, fn):
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+
+    def do(self, key, fn):
+        future, leader = self.begin(key)
+        if leader:
+            self.run(key, future, fn)
+        return future.result()
+
+    async def do_async(self, key, fn, executor=None):
+        future, leader = self.begin(key)
+        if leader:
+            asyncio.get_running_loop().run_in_executor(executor, self.run, key, future, fn)
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'calls': self.calls,
+                'executions': self.executions,
+                'deduplicated': self.deduplicated,
+                'in_flight': len(self.in_flight),
+            }
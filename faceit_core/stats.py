@@ -0,0 +1,88 @@
+""" Сводная статистика игрока и форматирование дат матчей """
+import math
+from datetime import datetime
+
+from faceit_core.stats_engine import MatchStats
+
+
+def format_date(date_string):
+    try:
+        date_obj = datetime.strptime(date_string, "%Y-%m-%dT%H:%M:%S%z")
+        formatted_date = date_obj.strftime("%b %d, %Y")
+        return formatted_date
+    except ValueError:
+        return "Invalid Date Format"
+
+
+def parse_updated_at(datetime_string):
+    """ Разбор отметки времени матча вида 2024-05-01T20:12:33.123Z (fromisoformat заметно быстрее strptime) """
+    try:
+        return datetime.fromisoformat(datetime_string.rstrip('Z'))
+    except (AttributeError, ValueError):
+        return datetime.strptime(datetime_string, "%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def format_time_since(datetime_string, current_time=None):
+    try:
+        updated_at = parse_updated_at(datetime_string)
+        current_time = current_time or datetime.utcnow()
+        time_difference = current_time - updated_at
+
+        if time_difference.days > 7:
+            formatted_date = updated_at.strftime("%d %b %Y - %H:%M")
+        elif time_difference.days > 1:
+            formatted_date = f"{time_difference.days} days ago"
+        elif time_difference.days == 1:
+            formatted_date = "1 day ago"
+        elif time_difference.seconds >= 3600:
+            hours = time_difference.seconds // 3600
+            formatted_date = f"{hours} hours ago"
+        elif time_difference.seconds >= 60:
+            minutes = time_difference.seconds // 60
+            formatted_date = f"{minutes} minutes ago"
+        else:
+            formatted_date = "just now"
+
+        return formatted_date
+    except ValueError:
+        return "Invalid Date"
+
+
+
+def calculate_averages(player_stats_data, num_matches, start_index=0):
+    match_stats = MatchStats.from_stats_data(player_stats_data)
+    if match_stats is None:
+        return None
+    return match_stats.averages(num_matches, start_index)
+
+
+def calculate_cs2_statistics(player_stats):
+    total_matches = 0
+    total_kills = 0
+    total_deaths = 0
+    total_wins = 0
+    total_matches_played = 0
+    total_headshots = 0
+    num_maps = 0
+    map_labels = set(["Anubis", "Mirage", "Ancient", "Nuke", "Dust2", "Vertigo", "Overpass", "Inferno"])
+    
+    for segment in player_stats["segments"]:
+        if segment.get("mode") == "5v5" and segment.get("label") in map_labels:
+            num_maps += 1
+            total_matches += int(segment["stats"]["Matches"])
+            total_kills += int(segment["stats"]["Kills"])
+            total_deaths += int(segment["stats"]["Deaths"])
+            total_wins += int(segment["stats"]["Wins"])
+            total_matches_played += int(segment["stats"]["Matches"])
+            total_headshots += int(segment["stats"]["Headshots"])
+    
+    average_kd_ratio = total_kills / total_deaths if num_maps > 0 else 0
+    win_rate_percentage = (total_wins / total_matches_played) * 100 if total_matches_played > 0 else 0
+    average_headshots_percentage = (total_headshots / total_kills) * 100 if num_maps > 0 else 0
+    
+    return {
+        "Matches": total_matches,
+        "Average K/D Ratio": math.ceil(average_kd_ratio * 100) / 100,
+        "Win Rate %": math.ceil(win_rate_percentage),
+        "Average Headshots %": math.ceil(average_headshots_percentage)
+    }
@@ -0,0 +1,104 @@
+import math
+import sys
+from array import array
+
+COLUMNS = (
+    ('kills', 'Kills'),
+    ('assists', 'Assists'),
+    ('deaths', 'Deaths'),
+    ('kr_ratio', 'K/R Ratio'),
+    ('kd_ratio', 'K/D Ratio'),
+    ('hs', 'Headshots %'),
+)
+
+
+def parse_number(value):
+    if isinstance(value, str):
+        value = value.strip().rstrip('%')
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class MatchStats:
+    """ Статистика матчей игрока, разобранная один раз в числовые колонки с префиксными суммами.
+
+    Матчи идут от новых к старым, как в ответе /games/cs2/stats. Среднее по любому окну
+    считается за O(1): sum[start:end] = prefix[end] - prefix[start].
+    complete — в items вся история игрока, поэтому count не вырастет от более глубокой загрузки.
+    Суммы по картам набираются в том же проходе: map_breakdown() не перечитывает матчи.
+    """
+
+    __slots__ = ('count', 'prefix', 'maps', 'complete')
+
+    def __init__(self, items, complete=False):
+        self.complete = complete
+        self.prefix = {name: array('d', [0.0]) for name, _ in COLUMNS}
+        self.maps = {}
+
+        for item in items:
+            stats = item.get('stats', {})
+            map_sums = self.maps.setdefault(stats.get('Map'), [0] + [0.0] * len(COLUMNS))
+            map_sums[0] += 1
+            for index, (name, field) in enumerate(COLUMNS, start=1):
+                value = parse_number(stats.get(field))
+                column = self.prefix[name]
+                column.append(column[-1] + value)
+                map_sums[index] += value
+
+        self.count = len(self.prefix['kills']) - 1
+
+    @staticmethod
+    def from_stats_data(player_stats_data):
+        if not player_stats_data or 'items' not in player_stats_data:
+            return None
+        return MatchStats(player_stats_data['items'], player_stats_data.get('complete', False))
+
+    @property
+    def nbytes(self):
+        columns = sum(column.itemsize * len(column) for column in self.prefix.values())
+        return columns + sys.getsizeof(self.maps) + sum(sys.getsizeof(map_sums) for map_sums in self.maps.values())
+
+    def window_sum(self, name, start, end):
+        column = self.prefix[name]
+        start = min(start, self.count)
+        end = min(end, self.count)
+        return column[end] - column[start]
+
+    def averages(self, num_matches, start_index=0):
+        """ Средние за num_matches матчей начиная с start_index (как calculate_averages) """
+        if num_matches <= 0 or start_index >= self.count:
+            return None
+        end = start_index + num_matches
+        return build_averages({name: self.window_sum(name, start_index, end) for name, _ in COLUMNS}, num_matches)
+
+    def compare(self, num_matches):
+        """ Средние за последние num_matches матчей и за предыдущие num_matches """
+        return self.averages(num_matches), self.averages(num_matches, start_index=num_matches)
+
+    def trend(self, num_matches):
+        """ Направление изменения каждого показателя: 'up', 'down' или None, если сравнивать не с чем """
+        last, prev = self.compare(num_matches)
+        if last is None or prev is None:
+            return None
+        return {key: 'up' if last[key] >= prev[key] else 'down' for key in last}
+
+    def map_breakdown(self):
+        """ Средние и число матчей по каждой карте среди разобранных матчей """
+        breakdown = {}
+        for map_name, map_sums in self.maps.items():
+            totals = {name: map_sums[index] for index, (name, _) in enumerate(COLUMNS, start=1)}
+            breakdown[map_name] = dict(build_averages(totals, map_sums[0]), matches=map_sums[0])
+        return breakdown
+
+
+def build_averages(totals, num_matches):
+    return {
+        'avg_kills': math.ceil(totals['kills'] / num_matches),
+        'avg_assists': math.ceil(totals['assists'] / num_matches),
+        'avg_deaths': math.ceil(totals['deaths'] / num_matches),
+        'avg_kr_ratio': totals['kr_ratio'] / num_matches,
+        'avg_kd_ratio': totals['kd_ratio'] / num_matches,
+        'avg_hs_procent': math.ceil(totals['hs'] / num_matches),
+    }
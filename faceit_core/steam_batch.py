@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import Future
+
+
+class SteamSummaryBatcher:
+    """ Сборщик запросов GetPlayerSummaries в пачки.
+
+    Запросы, пришедшие в течение window секунд (из любых потоков), отправляются одним
+    вызовом с несколькими SteamID64 (до max_batch штук); каждый вызывающий получает свой результат.
+    """
+
+    def __init__(self, fetch_summaries, window=0.02, max_batch=100):
+        self.fetch_summaries = fetch_summaries
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = {}
+        self.timer = None
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.requested = 0
+
+    def submit(self, steamid):
+        with self.lock:
+            self.requested += 1
+            futures = self.pending.setdefault(steamid, [])
+            future = Future()
+            futures.append(future)
+            if len(self.pending) >= self.max_batch:
+                batch = self.take_batch()
+            else:
+                batch = None
+                if self.timer is None:
+                    self.timer = threading.Timer(self.window, self.flush)
+                    self.timer.daemon = True
+                    self.timer.start()
+        if batch:
+            self.run_batch(batch)
+        return future
+
+    def take_batch(self):
+        steamids = list(self.pending)[:self.max_batch]
+        batch = {steamid: self.pending.pop(steamid) for steamid in steamids}
+        if not self.pending and self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        return batch
+
+    def flush(self):
+        while True:
+            with self.lock:
+                self.timer = None
+                if not self.pending:
+                    return
+                batch = self.take_batch()
+            self.run_batch(batch)
+
+    def run_batch(self, batch):
+        with self.lock:
+            self.batches += 1
+        try:
+            summaries = self.fetch_summaries(list(batch))
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+        for steamid, futures in batch.items():
+            for future in futures:
+                future.set_result(summaries.get(steamid))
+
+    def stats(self):
+        with self.lock:
+            return {'requested': self.requested, 'batches': self.batches, 'pending': len(self.pending)}
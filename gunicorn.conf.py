@@ -0,0 +1,34 @@
+""" Боевой запуск веб-части: gunicorn -c gunicorn.conf.py
+
+Несколько процессов с пулом потоков в каждом; кэши процессов можно объединить
+через общий бэкенд (CACHE_BACKEND_URL=redis://...).
+
+Квота FACEIT одна на ключ, а ограничитель частоты у каждого процесса свой, поэтому
+FACEIT_RATE_LIMIT и FACEIT_RATE_BURST делятся на число воркеров (FACEIT_RATE_PROCESSES).
+С Redis снимок топа загружает один процесс на интервал, остальные берут его из Redis.
+
+Без Redis многопроцессный режим не экономит квоту: кэши профилей, истории, рангов и страниц
+у каждого воркера свои, одинаковые запросы к разным воркерам уходят в FACEIT по отдельности,
+а перезапущенный по max_requests воркер начинает с пустыми кэшами. Фоновая загрузка топа
+в этом режиме выключена (воркеры берут только запрошенные страницы рейтинга через кэш).
+"""
+import multiprocessing
+import os
+
+wsgi_app = 'run:app'
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 8))
+timeout = int(os.environ.get('WEB_TIMEOUT', 60))
+keepalive = 5
+# процессы перезапускаются по очереди, чтобы не копить память
+max_requests = 2000
+max_requests_jitter = 200
+accesslog = '-'
+
+# окружение мастера наследуют воркеры: настройки ядра читаются уже в них
+os.environ.setdefault('FACEIT_RATE_PROCESSES', str(workers))
+if workers > 1 and not os.environ.get('CACHE_BACKEND_URL'):
+    # снимок топа (LEADERBOARD_DEPTH страниц на регион) без общего бэкенда загружал бы каждый воркер
+    os.environ.setdefault('LEADERBOARD_REFRESH_ENABLED', '0')
@@ -1,4 +1,7 @@
+import os
+
 from app.routes import app
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # только для разработки; в бою: gunicorn -c gunicorn.conf.py
+    app.run(debug=os.environ.get('FLASK_DEBUG', '1') == '1', threaded=True)
@@ -0,0 +1,268 @@
+""" Нагрузочный прогон веб-части и хендлеров бота против локальной замены FACEIT/Steam API.
+
+Поднимает tools/faceit_standin.py и приложение в одном процессе, гоняет сценарии с заданной
+параллельностью и выдаёт JSON: пропускная способность, p50/p95/p99, ошибки и число
+обращений к API на каждый сценарий. С --compare к результату добавляется сравнение
+с прошлым прогоном.
+
+Сценарии: index (/), player (/<nickname>), load_more (/load_more_rankings),
+bot_player (поиск игрока в боте), bot_avg (/last_20_avg), bot_top (/eu).
+
+Пример:
+    python tools/bench.py --requests 500 --concurrency 16 --latency 60 --jitter 30 --output bench.json
+    python tools/bench.py --scenarios player,bot_player --throttle-rate 0.05 --compare bench.json
+
+Настройки приложения берутся из окружения как обычно; лимит частоты FACEIT по умолчанию
+поднят, чтобы измерялось приложение, а не token bucket (FACEIT_RATE_LIMIT=10 — как в бою).
+Веб-сценарии можно направить в уже запущенный сервер (--target), настроенный на замену API.
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import requests
+
+import faceit_standin
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+WEB_SCENARIOS = ('index', 'player', 'load_more')
+BOT_SCENARIOS = ('bot_player', 'bot_avg', 'bot_top')
+
+
+def percentile(sorted_values, fraction):
+    """ Перцентиль методом ближайшего ранга """
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, duration, concurrency):
+    latencies = sorted(latencies)
+    ms = lambda value: round(value * 1000, 2) if value is not None else None
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'concurrency': concurrency,
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(len(latencies) / duration, 1) if duration else None,
+        'latency_ms': {
+            'p50': ms(percentile(latencies, 0.50)),
+            'p95': ms(percentile(latencies, 0.95)),
+            'p99': ms(percentile(latencies, 0.99)),
+            'mean': ms(sum(latencies) / len(latencies)) if latencies else None,
+            'max': ms(latencies[-1]) if latencies else None,
+        },
+    }
+
+
+def nicknames(count):
+    return [f'bench_{index}' for index in range(count)]
+
+
+def web_request(scenario, index, players, depth):
+    """ Путь запроса сценария; игроки и страницы рейтинга перебираются по кругу """
+    if scenario == 'index':
+        return '/'
+    if scenario == 'player':
+        return '/' + players[index % len(players)]
+    offset = (100 * (index + 1)) % depth
+    return f'/load_more_rankings?region=EU&offset={offset}&limit=100'
+
+
+def run_web(base_url, scenario, total, concurrency, players, depth):
+    local = threading.local()
+
+    def one(index):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        started_at = time.perf_counter()
+        try:
+            response = session.get(base_url + web_request(scenario, index, players, depth), timeout=60)
+            response.content
+            ok = response.status_code == 200
+        except requests.exceptions.RequestException:
+            ok = False
+        return time.perf_counter() - started_at, ok
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(total)))
+    duration = time.perf_counter() - started_at
+    return [latency for latency, _ in results], sum(1 for _, ok in results if not ok), duration
+
+
+class FakeMessage:
+    """ Минимум telegram.Message, который используют хендлеры: текст, чат и ответы """
+
+    def __init__(self, message_id, text):
+        self.id = message_id
+        self.text = text
+        self.chat = SimpleNamespace(type='private')
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+    async def reply_photo(self, photo, caption=None, **kwargs):
+        self.replies.append(caption)
+
+
+def bot_call(bot, scenario, index, players):
+    """ (хендлер, текст сообщения, user_data) для одного апдейта сценария """
+    nickname = players[index % len(players)]
+    if scenario == 'bot_player':
+        return bot.handle_message, nickname, {}
+    if scenario == 'bot_avg':
+        player_id, _ = faceit_standin.player_identity(nickname)
+        return bot.last_20_avg_command, '/last_20_avg', {'player_id': player_id}
+    return bot.eu_top_command, '/eu', {}
+
+
+def run_bot(bot, scenario, total, concurrency, players):
+    async def one(semaphore, index):
+        handler, text, user_data = bot_call(bot, scenario, index, players)
+        update = SimpleNamespace(message=FakeMessage(index, text))
+        context = SimpleNamespace(user_data=user_data)
+        async with semaphore:
+            started_at = time.perf_counter()
+            try:
+                await bot.start_update_deadline(update, context)
+                await handler(update, context)
+                ok = bool(update.message.replies) and not any(
+                    reply and reply.startswith('An error occurred') for reply in update.message.replies)
+            except Exception:
+                ok = False
+            return time.perf_counter() - started_at, ok
+
+    async def run_all():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(one(semaphore, index) for index in range(total)))
+
+    started_at = time.perf_counter()
+    results = asyncio.run(run_all())
+    duration = time.perf_counter() - started_at
+    return [latency for latency, _ in results], sum(1 for _, ok in results if not ok), duration
+
+
+def compare(current, previous):
+    """ Относительное изменение перцентилей и пропускной способности, % (минус — быстрее / меньше) """
+    comparison = {}
+    for name, result in current['scenarios'].items():
+        old = previous.get('scenarios', {}).get(name)
+        if not old:
+            continue
+        change = lambda new, before: round((new - before) * 100 / before, 1) if new is not None and before else None
+        comparison[name] = {
+            key: change(result['latency_ms'][key], old['latency_ms'][key]) for key in ('p50', 'p95', 'p99')
+        }
+        comparison[name]['throughput_rps'] = change(result['throughput_rps'], old['throughput_rps'])
+    return comparison
+
+
+def configure_environment(faceit_url, steam_url, workdir):
+    """ Приложение ходит в замену API и не трогает боевой индекс идентичностей """
+    os.environ['FACEIT_API_URL'] = faceit_url
+    os.environ['STEAM_API_URL'] = steam_url
+    os.environ['IDENTITY_DB_PATH'] = os.path.join(workdir, 'identity.sqlite3')
+    for key, value in (('FACEIT_API_KEY', 'bench'), ('STEAM_API_KEY', 'bench'), ('TELEGRAM_API_KEY', 'bench'),
+                       ('FACEIT_RATE_LIMIT', '100000'), ('FACEIT_RATE_BURST', '100000'), ('BOT_METRICS_PORT', '0')):
+        os.environ.setdefault(key, value)
+    sys.path.insert(0, ROOT)
+
+
+def start_web_server(flask_app):
+    import logging
+    from werkzeug.serving import make_server
+
+    # журнал доступа werkzeug на каждый запрос только мешает замерам
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, flask_app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='bench-web', daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', default=','.join(WEB_SCENARIOS + BOT_SCENARIOS))
+    parser.add_argument('--requests', type=int, default=200, help='запросов на сценарий')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=20, help='неизмеряемых запросов перед сценарием')
+    parser.add_argument('--players', type=int, default=50, help='разных игроков в player/bot_* сценариях')
+    parser.add_argument('--target', help='базовый URL уже запущенного веб-сервера вместо встроенного')
+    parser.add_argument('--output', help='файл для JSON (по умолчанию stdout)')
+    parser.add_argument('--compare', metavar='PREVIOUS_JSON', help='сравнить с результатом прошлого прогона')
+    faceit_standin.add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenarios) - set(WEB_SCENARIOS + BOT_SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    standin = faceit_standin.standin_from_args(args)
+    standin_server, faceit_url, steam_url = faceit_standin.start(standin)
+    workdir = tempfile.mkdtemp(prefix='faceit-bench-')
+    configure_environment(faceit_url, steam_url, workdir)
+
+    # приложение и бот печатают в stdout; в выводе остаётся только JSON
+    with contextlib.redirect_stdout(io.StringIO()):
+        from app import app as flask_app
+        web_server, base_url = (None, args.target.rstrip('/')) if args.target else start_web_server(flask_app)
+        bot = importlib.import_module('bot') if set(scenarios) & set(BOT_SCENARIOS) else None
+
+        players = nicknames(args.players)
+        depth = flask_app.config['LEADERBOARD_DEPTH']
+        results = {}
+        for scenario in scenarios:
+            if scenario in WEB_SCENARIOS:
+                run = lambda total: run_web(base_url, scenario, total, args.concurrency, players, depth)
+            else:
+                run = lambda total: run_bot(bot, scenario, total, args.concurrency, players)
+            if args.warmup:
+                run(args.warmup)
+            upstream_before = standin.stats()['requests']
+            latencies, errors, duration = run(args.requests)
+            upstream_after = standin.stats()['requests']
+            results[scenario] = summarize(latencies, errors, duration, args.concurrency)
+            results[scenario]['upstream_requests'] = {
+                route: count - upstream_before.get(route, 0)
+                for route, count in upstream_after.items() if count - upstream_before.get(route, 0)
+            }
+
+    report = {
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'fixtures')},
+        'scenarios': results,
+        'upstream': standin.stats(),
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report['comparison'] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if web_server is not None:
+        web_server.shutdown()
+    standin_server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+""" Сборка статики в app/static/dist: имена с хэшем содержимого, спрайт флагов,
+уменьшенные картинки карт и заранее сжатые gzip/brotli варианты.
+
+Пример:
+    python tools/build_assets.py
+    python tools/build_assets.py --sprite-max-bytes 4000 --map-width 240
+
+Результат описывается в dist/manifest.json; без него приложение отдаёт исходные файлы из app/static.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+from io import BytesIO
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app', 'static')
+COMPRESSIBLE = ('.svg', '.css', '.js', '.json')
+SKIPPED = ('.ts',)
+MAP_IMAGES_DIR = 'images'
+MAP_IMAGE_EXTENSIONS = ('.jpeg', '.jpg')
+
+SVG_ROOT_RE = re.compile(r'<svg\b([^>]*)>(.*)</svg>\s*$', re.S)
+VIEWBOX_RE = re.compile(r'viewBox="([^"]+)"')
+ID_RE = re.compile(r'\bid="([^"]+)"')
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def hashed_name(path, data):
+    root, ext = os.path.splitext(path)
+    return f'{root}.{content_hash(data)}{ext}'
+
+
+def write_asset(dist_dir, name, data):
+    """ Файл и его сжатые варианты (.gz, .br), если сжатие имеет смысл """
+    target = os.path.join(dist_dir, name)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(data)
+    if not name.endswith(COMPRESSIBLE):
+        return
+    with open(target + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, 9))
+    if brotli is not None:
+        with open(target + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def resize_map_image(data, width):
+    """ Картинка карты под ширину отображения (x2 для плотных экранов), пережатая без метаданных """
+    if Image is None:
+        return data
+    image = Image.open(BytesIO(data)).convert('RGB')
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    output = BytesIO()
+    image.save(output, 'JPEG', quality=82, optimize=True, progressive=True)
+    return output.getvalue() if output.tell() < len(data) else data
+
+
+def flag_symbol(code, svg):
+    """ <symbol> для спрайта или None, если флаг не подходит (нет viewBox, встроенные стили) """
+    match = SVG_ROOT_RE.search(svg)
+    if match is None or '<style' in svg:
+        return None
+    attributes, body = match.groups()
+    viewbox = VIEWBOX_RE.search(attributes)
+    if viewbox is None:
+        return None
+    # внутренние id (градиенты, <use>) уникализируются, чтобы флаги не конфликтовали в одном документе
+    for local_id in set(ID_RE.findall(body)):
+        prefixed = f'flag-{code}-{local_id}'
+        body = body.replace(f'id="{local_id}"', f'id="{prefixed}"')
+        body = body.replace(f'#{local_id}"', f'#{prefixed}"').replace(f'#{local_id})', f'#{prefixed})')
+    return f'<symbol id="flag-{code}" viewBox="{viewbox.group(1)}">{body.strip()}</symbol>'
+
+
+def build_flag_sprite(flags_dir, max_bytes):
+    symbols = {}
+    for filename in sorted(os.listdir(flags_dir)):
+        path = os.path.join(flags_dir, filename)
+        if not filename.endswith('.svg') or os.path.getsize(path) > max_bytes:
+            continue
+        code = filename[:-4]
+        with open(path, encoding='utf-8') as f:
+            symbol = flag_symbol(code, f.read())
+        if symbol is not None:
+            symbols[code] = symbol
+    sprite = ('<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">'
+              + ''.join(symbols.values()) + '</svg>')
+    return sorted(symbols), sprite.encode()
+
+
+def build(static_dir, sprite_max_bytes, map_width):
+    dist_dir = os.path.join(static_dir, 'dist')
+    shutil.rmtree(dist_dir, ignore_errors=True)
+    manifest = {'assets': {}, 'flag_sprite': None, 'sprite_flags': []}
+
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != dist_dir)
+        for filename in sorted(files):
+            if filename.endswith(SKIPPED):
+                continue
+            source = os.path.join(root, filename)
+            logical = os.path.relpath(source, static_dir).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                data = f.read()
+            if logical.startswith(MAP_IMAGES_DIR + '/') and filename.endswith(MAP_IMAGE_EXTENSIONS):
+                data = resize_map_image(data, map_width)
+            name = hashed_name(logical, data)
+            write_asset(dist_dir, name, data)
+            manifest['assets'][logical] = name
+
+    sprite_flags, sprite = build_flag_sprite(os.path.join(static_dir, 'flags'), sprite_max_bytes)
+    sprite_name = hashed_name('flags/sprite.svg', sprite)
+    write_asset(dist_dir, sprite_name, sprite)
+    manifest['flag_sprite'] = sprite_name
+    manifest['sprite_flags'] = sprite_flags
+
+    with open(os.path.join(dist_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--static-dir', default=STATIC_DIR)
+    parser.add_argument('--sprite-max-bytes', type=int, default=2500,
+                        help='флаги крупнее остаются отдельными файлами (детальные гербы раздувают спрайт)')
+    parser.add_argument('--map-width', type=int, default=180)
+    args = parser.parse_args()
+
+    manifest = build(os.path.abspath(args.static_dir), args.sprite_max_bytes, args.map_width)
+    print(f"{len(manifest['assets'])} assets, {len(manifest['sprite_flags'])} flags in {manifest['flag_sprite']}"
+          + ('' if brotli is not None else ' (brotli not installed: only gzip variants)')
+          + ('' if Image is not None else ' (Pillow not installed: map images copied as is)'))
+
+
+if __name__ == '__main__':
+    main()
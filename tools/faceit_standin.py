@@ -0,0 +1,370 @@
+""" Локальная замена FACEIT Data API v4 и Steam Web API для бенчмарков и офлайн-проверки.
+
+Отвечает на эндпоинты из faceit_core/players.py записанными ответами из tools/fixtures/faceit:
+профиль, общая статистика, история матчей, матч с составами команд, рейтинг региона
+и позиция игрока, ResolveVanityURL и GetPlayerSummaries. Существующим считается любой никнейм, кроме
+начинающихся с "missing"; player_id и SteamID64 выводятся из никнейма детерминированно.
+Задержка, ошибки 5xx и 429 с Retry-After добавляются параметрами.
+
+Пример:
+    python tools/faceit_standin.py --port 8090 --latency 80 --jitter 40 --throttle-rate 0.02
+    FACEIT_API_URL=http://127.0.0.1:8090/data/v4 STEAM_API_URL=http://127.0.0.1:8090/steam python run.py
+
+Перезапись фикстур ответами настоящего API (нужны FACEIT_API_KEY и STEAM_API_KEY):
+    python tools/faceit_standin.py --record s1mple
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'faceit')
+FIXTURES = ('player', 'lifetime_stats', 'match_history', 'match', 'ranking', 'player_rank', 'resolve_vanity',
+            'player_summaries')
+PLAYER_NAMESPACE = uuid.UUID('9a0a6f1e-2d55-4c0e-8d87-3c1f8f6b0d11')
+STEAM_ID_BASE = 76561197960265728
+
+ROUTES = [(name, re.compile(pattern)) for name, pattern in (
+    ('player_lookup', r'^/data/v4/players$'),
+    ('player', r'^/data/v4/players/([^/]+)$'),
+    ('lifetime_stats', r'^/data/v4/players/([^/]+)/stats/cs2$'),
+    ('match_history', r'^/data/v4/players/([^/]+)/games/cs2/stats$'),
+    ('match', r'^/data/v4/matches/([^/]+)$'),
+    ('ranking', r'^/data/v4/rankings/games/cs2/regions/(\w+)$'),
+    ('player_rank', r'^/data/v4/rankings/games/cs2/regions/(\w+)/players/([^/]+)$'),
+    ('resolve_vanity', r'^/steam/ISteamUser/ResolveVanityURL/v0001/?$'),
+    ('player_summaries', r'^/steam/ISteamUser/GetPlayerSummaries/v0002/?$'),
+)]
+
+
+def load_fixtures(fixtures_dir):
+    fixtures = {}
+    for name in FIXTURES:
+        with open(os.path.join(fixtures_dir, name + '.json')) as f:
+            fixtures[name] = json.load(f)
+    return fixtures
+
+
+def stable_number(value):
+    return uuid.uuid5(PLAYER_NAMESPACE, value).int
+
+
+def player_identity(nickname):
+    """ Детерминированные (player_id, SteamID64) для никнейма """
+    player_id = str(uuid.uuid5(PLAYER_NAMESPACE, nickname.lower()))
+    return player_id, str(STEAM_ID_BASE + stable_number(player_id) % 10 ** 9)
+
+
+class StandIn:
+    """ Ответы на запросы к API и учёт обращений; потокобезопасен """
+
+    def __init__(self, fixtures, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, retry_after=1,
+                 history_length=300, ranking_depth=1000, slow=None, seed=None):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.history_length = history_length
+        self.ranking_depth = ranking_depth
+        self.slow = slow or {}
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.players = {}
+        self.steam_ids = {}
+        self.histories = OrderedDict()
+        self.requests = Counter()
+        self.statuses = Counter()
+
+    def stats(self):
+        with self.lock:
+            return {'requests': dict(self.requests), 'statuses': {str(k): v for k, v in self.statuses.items()},
+                    'total': sum(self.requests.values())}
+
+    def handle(self, path, query):
+        """ (route, status, headers, payload) для запроса """
+        for name, pattern in ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            return 'unknown', 404, {}, {'errors': [{'message': 'Not found'}]}
+
+        delay = self.latency + self.random.uniform(0, self.jitter) + self.slow.get(name, 0)
+        if delay:
+            time.sleep(delay)
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            return name, 429, {'Retry-After': str(self.retry_after)}, {'errors': [{'message': 'Too many requests'}]}
+        if roll < self.throttle_rate + self.error_rate:
+            return name, 503, {}, {'errors': [{'message': 'Service unavailable'}]}
+        status, payload = getattr(self, 'respond_' + name)(*match.groups(), query=query)
+        return name, status, {}, payload
+
+    def register(self, nickname):
+        player_id, steam_id = player_identity(nickname)
+        with self.lock:
+            self.players[player_id] = nickname
+            self.steam_ids[steam_id] = nickname
+        return player_id, steam_id
+
+    def player(self, nickname):
+        if nickname.lower().startswith('missing'):
+            return None
+        player_id, steam_id = self.register(nickname)
+        data = copy.deepcopy(self.fixtures['player'])
+        data.update(player_id=player_id, nickname=nickname, steam_id_64=steam_id, steam_nickname=nickname,
+                    faceit_url=f'https://www.faceit.com/{{lang}}/players/{nickname}')
+        data['platforms'] = {'steam': steam_id}
+        cs2 = data['games']['cs2']
+        cs2.update(game_player_id=steam_id, game_player_name=nickname, faceit_elo=1500 + stable_number(player_id) % 2500)
+        return data
+
+    def nickname_for(self, player_id):
+        with self.lock:
+            return self.players.get(player_id)
+
+    def respond_player_lookup(self, query):
+        if 'nickname' in query:
+            data = self.player(query['nickname'])
+        else:
+            steam_id = query.get('game_player_id', '')
+            if not steam_id.isdigit():
+                return 400, {'errors': [{'message': 'Invalid game_player_id'}]}
+            with self.lock:
+                nickname = self.steam_ids.get(steam_id)
+            data = self.player(nickname or f'steam{steam_id[-8:]}')
+            if data is not None:
+                # ответ должен относиться к запрошенному SteamID64
+                data['steam_id_64'] = data['games']['cs2']['game_player_id'] = steam_id
+                with self.lock:
+                    self.steam_ids[steam_id] = data['nickname']
+        return (200, data) if data is not None else (404, {'errors': [{'message': 'Player not found'}]})
+
+    def respond_player(self, player_id, query):
+        nickname = self.nickname_for(player_id)
+        if nickname is None:
+            return 404, {'errors': [{'message': 'Player not found'}]}
+        return 200, self.player(nickname)
+
+    def respond_lifetime_stats(self, player_id, query):
+        data = copy.deepcopy(self.fixtures['lifetime_stats'])
+        data['player_id'] = player_id
+        return 200, data
+
+    def history(self, player_id):
+        """ История матчей игрока: записанные матчи по кругу с уникальными Match Id и убывающим временем """
+        with self.lock:
+            items = self.histories.get(player_id)
+            if items is not None:
+                self.histories.move_to_end(player_id)
+                return items
+        templates = self.fixtures['match_history']['items']
+        newest = datetime.utcnow().replace(microsecond=0) - timedelta(hours=1)
+        items = []
+        for index in range(self.history_length):
+            item = copy.deepcopy(templates[index % len(templates)])
+            stats = item['stats']
+            finished_at = newest - timedelta(hours=6 * index)
+            stats['Match Id'] = f'1-{uuid.uuid5(PLAYER_NAMESPACE, f"{player_id}:{index}")}'
+            stats['Player Id'] = player_id
+            stats['Updated At'] = finished_at.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+            stats['Created At'] = (finished_at - timedelta(minutes=40)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+            items.append(item)
+        with self.lock:
+            self.histories[player_id] = items
+            if len(self.histories) > 256:
+                self.histories.popitem(last=False)
+        return items
+
+    def respond_match_history(self, player_id, query):
+        limit = int(query.get('limit', 20))
+        offset = int(query.get('offset', 0))
+        items = self.history(player_id)[offset:offset + limit]
+        return 200, {'items': items, 'start': offset, 'end': offset + len(items)}
+
+    def respond_match(self, match_id, query):
+        """ Записанный матч под запрошенным id; игроки составов известны и по player_id """
+        if not match_id.startswith('1-'):
+            return 404, {'errors': [{'message': 'Match not found'}]}
+        data = copy.deepcopy(self.fixtures['match'])
+        data['match_id'] = match_id
+        for team in data['teams'].values():
+            for member in team['roster']:
+                member['player_id'], member['game_player_id'] = self.register(member['nickname'])
+        return 200, data
+
+    def respond_ranking(self, region, query):
+        limit = int(query.get('limit', 20))
+        offset = int(query.get('offset', 0))
+        templates = self.fixtures['ranking']['items']
+        items = []
+        for position in range(offset + 1, min(offset + limit, self.ranking_depth) + 1):
+            item = dict(templates[(position - 1) % len(templates)])
+            nickname = f'{region.lower()}_player{position}'
+            item.update(player_id=self.register(nickname)[0], nickname=nickname, position=position,
+                        faceit_elo=max(1000, 4600 - position * 3))
+            items.append(item)
+        return 200, {'items': items, 'start': offset, 'end': offset + len(items)}
+
+    def respond_player_rank(self, region, player_id, query):
+        data = copy.deepcopy(self.fixtures['player_rank'])
+        position = 1 + stable_number(player_id) % (5000 if 'country' in query else 100000)
+        data['position'] = position
+        for item in data['items']:
+            item.update(player_id=player_id, nickname=self.nickname_for(player_id) or item.get('nickname'),
+                        position=position)
+        return 200, data
+
+    def respond_resolve_vanity(self, query):
+        vanity_url = query.get('vanityurl', '')
+        if not vanity_url or vanity_url.lower().startswith('missing'):
+            return 200, {'response': {'success': 42, 'message': 'No match'}}
+        return 200, {'response': {'steamid': self.register(vanity_url)[1], 'success': 1}}
+
+    def respond_player_summaries(self, query):
+        template = self.fixtures['player_summaries']['response']['players'][0]
+        players = []
+        for steam_id in filter(None, query.get('steamids', '').split(',')):
+            with self.lock:
+                nickname = self.steam_ids.get(steam_id)
+            player = dict(template, steamid=steam_id, personaname=nickname or f'steam{steam_id[-8:]}')
+            player['profileurl'] = f'https://steamcommunity.com/profiles/{steam_id}/'
+            players.append(player)
+        return 200, {'response': {'players': players}}
+
+
+def make_handler(standin):
+    class ApiHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            route, status, headers, payload = standin.handle(url.path, query)
+            with standin.lock:
+                standin.requests[route] += 1
+                standin.statuses[status] += 1
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ApiHandler
+
+
+def start(standin, host='127.0.0.1', port=0):
+    """ Сервер в фоновом потоке; возвращает (server, faceit_url, steam_url) """
+    server = ThreadingHTTPServer((host, port), make_handler(standin))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='faceit-standin', daemon=True).start()
+    base_url = f'http://{host}:{server.server_port}'
+    return server, base_url + '/data/v4', base_url + '/steam'
+
+
+def parse_slow(values):
+    """ ['player_rank=2.5', ...] -> {'player_rank': 2.5} """
+    slow = {}
+    for value in values or ():
+        route, _, seconds = value.partition('=')
+        slow[route] = float(seconds)
+    return slow
+
+
+def record(nickname, fixtures_dir):
+    """ Запись фикстур ответами настоящих FACEIT и Steam API для одного игрока """
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from faceit_core.settings import settings
+    from faceit_core.client import faceit_client, steam_client
+
+    def get(client, path, params=None):
+        response = client.get(path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    faceit = faceit_client()
+    player = get(faceit, 'players', {'nickname': nickname})
+    player_id = player['player_id']
+    region = player['games']['cs2']['region']
+    responses = {
+        'player': player,
+        'lifetime_stats': get(faceit, f'players/{player_id}/stats/cs2'),
+        'match_history': get(faceit, f'players/{player_id}/games/cs2/stats', {'limit': 20}),
+        'ranking': get(faceit, f'rankings/games/cs2/regions/{region}', {'limit': 20}),
+        'player_rank': get(faceit, f'rankings/games/cs2/regions/{region}/players/{player_id}'),
+    }
+    if responses['match_history'].get('items'):
+        match_id = responses['match_history']['items'][0]['stats']['Match Id']
+        responses['match'] = get(faceit, f'matches/{match_id}')
+    if settings['STEAM_API_KEY'] and player.get('steam_id_64'):
+        responses['player_summaries'] = get(steam_client(), 'ISteamUser/GetPlayerSummaries/v0002/',
+                                            {'key': settings['STEAM_API_KEY'], 'steamids': player['steam_id_64']})
+    for name, data in responses.items():
+        with open(os.path.join(fixtures_dir, name + '.json'), 'w') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+    return sorted(responses)
+
+
+def add_standin_arguments(parser):
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--latency', type=float, default=0, help='задержка каждого ответа, мс')
+    parser.add_argument('--jitter', type=float, default=0, help='случайная добавка к задержке, мс')
+    parser.add_argument('--error-rate', type=float, default=0, help='доля ответов 503')
+    parser.add_argument('--throttle-rate', type=float, default=0, help='доля ответов 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After у ответов 429, с')
+    parser.add_argument('--history-length', type=int, default=300, help='матчей в истории каждого игрока')
+    parser.add_argument('--slow', action='append', metavar='ROUTE=SECONDS',
+                        help='дополнительная задержка одного эндпоинта, например player_rank=3')
+    parser.add_argument('--seed', type=int)
+
+
+def standin_from_args(args):
+    return StandIn(load_fixtures(args.fixtures), latency=args.latency / 1000, jitter=args.jitter / 1000,
+                   error_rate=args.error_rate, throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+                   history_length=args.history_length, slow=parse_slow(args.slow), seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--record', metavar='NICKNAME', help='перезаписать фикстуры ответами настоящего API')
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    if args.record:
+        print('Recorded: ' + ', '.join(record(args.record, args.fixtures)))
+        return
+
+    standin = standin_from_args(args)
+    server, faceit_url, steam_url = start(standin, args.host, args.port)
+    print(f'FACEIT_API_URL={faceit_url} STEAM_API_URL={steam_url}')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(json.dumps(standin.stats(), indent=2))
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
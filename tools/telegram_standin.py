@@ -0,0 +1,152 @@
+""" Локальная замена Telegram Bot API для проверки webhook-режима бота.
+
+Поднимает фейковый Bot API (getMe, setWebhook, sendMessage, ...) и после регистрации
+webhook отправляет записанные Update из JSON-файла на локальный endpoint бота
+с заголовком X-Telegram-Bot-Api-Secret-Token.
+
+Пример:
+    python tools/telegram_standin.py --api-port 8081 --webhook http://127.0.0.1:8443/telegram --secret s3cret
+    TELEGRAM_API_URL=http://127.0.0.1:8081/bot BOT_MODE=webhook WEBHOOK_SECRET=s3cret \\
+        WEBHOOK_URL=http://127.0.0.1:8443/telegram python bot.py
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import requests
+
+DEFAULT_UPDATES = os.path.join(os.path.dirname(__file__), 'fixtures', 'telegram_updates.json')
+
+BOT_USER = {'id': 1, 'is_bot': True, 'first_name': 'Faceit helper', 'username': 'Faceit_helper_bot'}
+
+
+class BotApiState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.webhook_set = threading.Event()
+        self.replies = []
+        self.message_id = 1000
+
+    def next_message(self, params):
+        with self.lock:
+            self.message_id += 1
+            self.replies.append(params)
+            chat_id = int(params.get('chat_id', 0))
+            return {
+                'message_id': self.message_id,
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'from': BOT_USER,
+                'text': params.get('text') or params.get('caption') or '',
+            }
+
+
+def make_handler(state):
+    class BotApiHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            method = self.path.rstrip('/').rsplit('/', 1)[-1]
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0) or 0))
+            params = parse_params(self.headers.get('Content-Type', ''), body)
+
+            if method == 'getMe':
+                result = BOT_USER
+            elif method in ('setWebhook', 'deleteWebhook', 'setMyCommands'):
+                result = True
+                if method == 'setWebhook':
+                    state.webhook_set.set()
+            elif method in ('sendMessage', 'sendPhoto'):
+                result = state.next_message(params)
+            else:
+                result = True
+
+            payload = json.dumps({'ok': True, 'result': result}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST
+
+        def log_message(self, format, *args):
+            pass
+
+    return BotApiHandler
+
+
+def parse_params(content_type, body):
+    if not body:
+        return {}
+    if 'json' in content_type:
+        return json.loads(body)
+    if 'multipart/form-data' in content_type:
+        return parse_multipart(content_type, body)
+    return {key: values[0] for key, values in parse_qs(body.decode()).items()}
+
+
+def parse_multipart(content_type, body):
+    boundary = content_type.split('boundary=')[-1].strip('"').encode()
+    params = {}
+    for part in body.split(b'--' + boundary):
+        headers, _, value = part.partition(b'\r\n\r\n')
+        if b'name="' not in headers:
+            continue
+        name = headers.split(b'name="')[1].split(b'"')[0].decode()
+        params[name] = value.rstrip(b'\r\n').decode(errors='replace')
+    return params
+
+
+def replay_updates(updates, webhook_url, secret, concurrency):
+    """ Отправка записанных Update на webhook бота; возвращает коды ответов и задержки """
+    session = requests.Session()
+
+    def post(update):
+        started_at = time.perf_counter()
+        response = session.post(webhook_url, json=update, headers={'X-Telegram-Bot-Api-Secret-Token': secret})
+        return response.status_code, time.perf_counter() - started_at
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(post, updates))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Telegram Bot API stand-in for webhook mode')
+    parser.add_argument('--api-port', type=int, default=8081)
+    parser.add_argument('--webhook', default='http://127.0.0.1:8443/telegram')
+    parser.add_argument('--secret', default=os.environ.get('WEBHOOK_SECRET', ''))
+    parser.add_argument('--updates', default=DEFAULT_UPDATES)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--wait', type=float, default=60, help='seconds to wait for setWebhook')
+    args = parser.parse_args()
+
+    state = BotApiState()
+    server = ThreadingHTTPServer(('127.0.0.1', args.api_port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f'Bot API stand-in on http://127.0.0.1:{args.api_port}/bot')
+
+    if not state.webhook_set.wait(args.wait):
+        raise SystemExit('Bot did not register a webhook in time')
+
+    with open(args.updates) as f:
+        updates = json.load(f)
+
+    results = replay_updates(updates, args.webhook, args.secret, args.concurrency)
+    rejected = replay_updates(updates[:1], args.webhook, 'wrong-secret', 1)
+    time.sleep(2)
+
+    print(json.dumps({
+        'posted': len(results),
+        'statuses': [status for status, _ in results],
+        'wrong_secret_status': rejected[0][0],
+        'replies': len(state.replies),
+    }, indent=2))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()